@@ -27,11 +27,12 @@ if __name__ == "__main__":
     camera.aperture     = 2.8
     camera.isoSpeed     = 800
 
-    # The live view stream is an iterator, and can be called using a
-    # for loop, each iteration being a new frame collected by camera
-    for frame in camera.liveViewStream():
-        # Convert bytes to numpy buffer
-        npBuffer = np.frombuffer(frame, dtype=np.uint8)
+    # The live view stream frames can be iterated using a for loop,
+    # each iteration being a new frame collected by camera. Frames are
+    # views over the SDK buffer, only valid until the next iteration.
+    for frame in camera.liveViewStream().frames():
+        # Wrap the frame data into a numpy buffer (no copy involved)
+        npBuffer = np.frombuffer(frame.data, dtype=np.uint8)
 
         # Decode JPEG image
         img = cv2.imdecode(npBuffer, cv2.IMREAD_COLOR)
@@ -0,0 +1,145 @@
+import ctypes, os, queue, threading, time
+
+from collections        import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from .core._functions import _download, _downloadComplete, _downloadCancel
+from .core._functions import _createMemoryStream, _getPointer, _seek, _release
+
+from .core._types     import _DirectoryItemRef, _DirectoryItemInfo, _SeekOrigin
+
+
+# Frames are shots, each of them made of one item or more (e.g. RAW+JPEG)
+BurstReport = namedtuple("BurstReport", ["frames", "items", "bytes", "duration", "fps", "mbps", "files"])
+
+
+class _Burst:
+    # Items transferred during a burst are queued by the object event
+    # handler, which returns at once. A single thread downloads them from
+    # the camera (transfers are sequential on the USB link anyway), and
+    # files are written by a pool of threads, so that the camera buffer is
+    # emptied at the rate of the link rather than the rate of the disk.
+    # Shots are counted in items: itemsPerShot of them are transferred for
+    # each picture (2 with RAW+JPEG).
+    def __init__(self, template: str, writers: int = 4, maxQueued: int = 16, itemsPerShot: int = 1):
+        self._template     = template
+        self._itemsPerShot = itemsPerShot
+        self._transfers    = queue.Queue()
+
+        self._writers    = ThreadPoolExecutor(writers, thread_name_prefix="pyedsdk-burst-writer")
+        self._writeSlots = threading.BoundedSemaphore(maxQueued)
+        self._writes     = []
+        self._errors     = []
+
+        self._downloader = threading.Thread(target=self._downloadItems, daemon=True)
+        self._stream     = None
+
+        self.requested    = 0
+        self.downloaded   = 0
+        self.bytes        = 0
+        self.files        = []
+        self.startTime    = None
+        self.lastTransfer = None
+        self.lastDownload = None
+
+
+    def start(self):
+        self.startTime = self.lastTransfer = time.monotonic()
+        self._downloader.start()
+
+    def transfer(self, ref: _DirectoryItemRef, itemInfo: _DirectoryItemInfo):
+        # Called from the object event handler: the reference is released
+        # once the item is downloaded
+        self.requested   += 1
+        self.lastTransfer = time.monotonic()
+        self._transfers.put((ref, itemInfo))
+
+    def filename(self, index: int, itemInfo: _DirectoryItemInfo) -> str:
+        name, ext = os.path.splitext(itemInfo.szFileName.decode(errors="replace"))
+        return self._template.format(index=index, name=name, ext=ext)
+
+
+    # --------- Download and writer threads ---------
+    def _downloadItems(self):
+        while (transfer := self._transfers.get()) is not None:
+            ref, itemInfo = transfer
+            try:
+                data = self._downloadItem(ref, itemInfo)
+            except Exception as error:
+                self._errors.append(error)
+                continue
+            finally:
+                _release(ref)
+
+            filename = self.filename(self.downloaded, itemInfo)
+            self.downloaded  += 1
+            self.bytes       += len(data)
+            self.lastDownload = time.monotonic()
+            self.files.append(filename)
+
+            # Bounds the memory held by images waiting to be written
+            self._writeSlots.acquire()
+            self._writes.append(self._writers.submit(self._write, filename, data))
+
+        if self._stream is not None:
+            _release(self._stream)
+            self._stream = None
+
+    def _downloadItem(self, ref: _DirectoryItemRef, itemInfo: _DirectoryItemInfo) -> bytes:
+        # Memory stream is kept from one item to the next
+        if self._stream is None:
+            self._stream = _createMemoryStream(itemInfo.size)
+        _seek(self._stream, 0, _SeekOrigin._Begin)
+
+        try:
+            _download(ref, itemInfo.size, self._stream)
+        except Exception:
+            _downloadCancel(ref)
+            raise
+        _downloadComplete(ref)
+
+        return ctypes.string_at(_getPointer(self._stream).value, itemInfo.size)
+
+    def _write(self, filename: str, data: bytes):
+        try:
+            with open(filename, "wb") as file:
+                file.write(data)
+        finally:
+            self._writeSlots.release()
+
+
+    # --------- End of burst ---------
+    def done(self, count: int = None, duration: float = None) -> bool:
+        # Count is the number of shots, not of items
+        if count is not None and self.requested >= count * self._itemsPerShot:
+            return True
+        return duration is not None and time.monotonic() - self.startTime >= duration
+
+    def close(self):
+        # Waits for the queued items to be downloaded and written, without
+        # raising their errors: used when the burst itself failed
+        if self._downloader.ident is not None:
+            self._transfers.put(None)
+            self._downloader.join()
+        self._writers.shutdown(wait=True)
+
+    def finish(self) -> BurstReport:
+        self.close()
+
+        for write in self._writes:
+            if write.exception() is not None:
+                self._errors.append(write.exception())
+        if self._errors:
+            raise self._errors[0]
+
+        duration = (self.lastDownload or self.startTime) - self.startTime
+        frames   = self.downloaded // self._itemsPerShot
+        return BurstReport(
+            frames   = frames,
+            items    = self.downloaded,
+            bytes    = self.bytes,
+            duration = duration,
+            fps      = frames / duration if duration > 0 else 0.,
+            mbps     = self.bytes / duration / 1e6 if duration > 0 else 0.,
+            files    = self.files
+        )
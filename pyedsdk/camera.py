@@ -1,34 +1,46 @@
-import ctypes, math, threading
+import asyncio, concurrent.futures, ctypes, functools, math, threading, time
+
+from concurrent.futures import ThreadPoolExecutor
 
 
 from .core._sdk import _SDK
 
+from .core._errors    import CanonError, _ErrorCode
+
 from .core._functions import _getCameraList
 from .core._functions import _getChildCount, _getChildAtIndex
 from .core._functions import _getPropertyData, _setPropertyData, _getPropertyDesc
 from .core._functions import _release
 from .core._functions import _openSession, _closeSession, _sendCommand, _setCapacity
 from .core._functions import _createFlashSettingRef
-from .core._functions import _getDirectoryItemInfo, _download, _downloadComplete
-from .core._functions import _createFileStream
+from .core._functions import _getDirectoryItemInfo
 from .core._functions import _setObjectEventHandler, _getEvent
 
 from .core._types      import _BaseRef
 from .core._types      import _Rational, _Capacity
-from .core._types      import _Access, _PropertyID, _SaveTo, _CameraCommand, _ObjectEvent, _FileCreateDisposition, _ImageQuality
+from .core._types      import _PropertyID, _SaveTo, _CameraCommand, _ObjectEvent, _ImageQuality, _ShutterButton
 
 from .core._enums      import _Aperture, _ShutterSpeed, _ISOSpeed, _AFMode, _EvfOutputDevice
 
 from .core._callbacks  import _ObjectEventHandler
-from .core._callbacks  import _waitForEvent
+from .core._callbacks  import _waitForEvent, _pumpWhileWaiting, _pumpWindowsMessages, _hasMessageQueue
+from .core._callbacks  import _acquireEventPump, _releaseEventPump
 
 from .live_view_stream import LiveViewStream
 
+from .download         import _FileDownload, _MemoryDownloadPool, _SinkDownload, HostFileWriter
+from .capture          import _CapturePipeline, _itemsPerShot
+from .burst            import _Burst, BurstReport
+from .capture_metrics  import CaptureMetrics, CaptureRecord
+from .sidecar          import _hashers, _sidecarRecord, _writeSidecar
+from .card             import _readVolumes
+from .card_sync        import CardSync, SyncReport
+
 
 class EOSCamera:
 
     # --------- Init function ---------
-    def __init__(self, cameraIndex):
+    def __init__(self, cameraIndex, maxCapturesInFlight: int = 2, eventPump=None, pumpInterval: float = 0.005):
         _SDK._initialize()
 
         # Check if cameraIndex is valid
@@ -44,11 +56,17 @@ class EOSCamera:
         _release(cameraListRef)
 
         _openSession(self._cameraRef)
-        self._isClosed = False
+
+        # Event pump thread, acquired once the camera is initialized
+        self._eventPump = None
+        self._isClosed  = False
 
         # Stream created when needed
         self._liveViewStream = None
 
+        # Memory cards, browsed when needed
+        self._volumes = None
+
         # Initialising flash reference
         self._flashRef = _createFlashSettingRef(self._cameraRef)
 
@@ -65,9 +83,34 @@ class EOSCamera:
             reset          = 1)
         _setCapacity(self._cameraRef, capacity)
 
-        # Event management for download right after shot will be done using
-        # threadings and SDK object event handler. One needs to define them
-        self._downloadEvent = None
+        # Captures waiting for their download. Each transferred item goes to
+        # the target of the oldest one, and completes its future.
+        self._captures = _CapturePipeline(maxInFlight=maxCapturesInFlight)
+
+        # Timeline of every captured item
+        self._captureMetrics = CaptureMetrics()
+
+        # Burst in progress, which takes over every transferred item
+        self._burst = None
+
+        # Files are written by the SDK file stream, unless a HostFileWriter
+        # is set (preallocation, large writes and fsync policy)
+        self.hostWriter = None
+
+        # Digests computed while downloading (hashlib names, e.g. "sha256"),
+        # and sidecar record of each item: None, "file" (JSON written next to
+        # the file) or a callable receiving the record
+        self.digests       = ()
+        self.sidecar       = None
+        self._digestWriter = None
+
+        # Items of a capture are downloaded off the event pump thread, so
+        # that the next transfer request is handled meanwhile
+        self._itemDownloads = ThreadPoolExecutor(2, thread_name_prefix="pyedsdk-download")
+
+        # Memory streams reused by the shots downloaded in memory: each
+        # capture in flight has its own ones (one per item, e.g. RAW+JPEG)
+        self._memoryDownloads = _MemoryDownloadPool(maxCapturesInFlight)
 
         # It is absolutely necessary to declare the _handler as part of the
         # class instance, in order to save it from Python garbage collector
@@ -101,6 +144,15 @@ class EOSCamera:
         self._imageQuality = _ImageQuality._LR # RAW
         _setPropertyData(self._cameraRef, _PropertyID._ImageQuality, 0, _ImageQuality._LR)
 
+        # On Windows, SDK events are dispatched through the message queue of
+        # the thread which initialized the SDK, which pumps them whenever it
+        # waits (shot(), wait(), burst()...). Elsewhere, or when a backend is
+        # given, a background thread shared by all the cameras delivers them
+        # (EdsGetEvent by default). Acquired last, as nothing releases it if
+        # the initialization fails.
+        if eventPump is not None or not _hasMessageQueue():
+            self._eventPump = _acquireEventPump(eventPump or _getEvent, pumpInterval)
+
 
     def __enter__(self):
         return self
@@ -128,29 +180,63 @@ class EOSCamera:
     def _objectEventHandler(self, event: _ObjectEvent, ref: _BaseRef, context: ctypes.c_void_p) -> int:
         if event == _ObjectEvent._DirItemRequestTransfer:
 
-            itemInfo = _getDirectoryItemInfo(ref)
-            itemSize = itemInfo.size
+            requested = time.monotonic()
+            itemInfo  = _getDirectoryItemInfo(ref)
 
-            stream = _createFileStream(
-                self._filename,
-                _FileCreateDisposition._CreateAlways,
-                _Access._Write
-            )
+            # During a burst, items are queued and downloaded in background
+            if self._burst is not None:
+                self._burst.transfer(ref, itemInfo)
+                return 0
 
-            try:
-                _download(ref, itemSize, stream)
-                _downloadComplete(ref)
+            capture, index = self._captures.next()
+            if capture is not None:
+                self._itemDownloads.submit(self._downloadItem, capture, index, ref, itemInfo, requested)
+                return 0
 
+            # Items not requested by shot() (e.g. shutter pressed on the
+            # camera body) are saved to the current filename
+            try:
+                _FileDownload(self._filename, True, self.hostWriter)(ref, itemInfo)
             finally:
-                _release(stream)
                 _release(ref)
 
-            if self._downloadEvent:
-                self._downloadEvent.set()
-
         return 0
 
 
+    def _downloadItem(self, capture, index: int, ref: _BaseRef, itemInfo, requested: float):
+        # Errors cannot be raised through the SDK: they are handed to the
+        # future of the capture
+        started  = time.monotonic()
+        timeline = {}
+        hashers  = _hashers(self.digests)
+        try:
+            result    = capture.targets[index](ref, itemInfo, timeline, hashers)
+            completed = time.monotonic()
+
+            record = CaptureRecord(capture.triggered, capture.accepted, requested, started,
+                                   timeline.get("downloaded", completed), completed, itemInfo.size)
+            self._captureMetrics.record(record)
+
+            if self.sidecar is not None:
+                filename = result if isinstance(result, str) else None
+                sidecar  = _sidecarRecord(itemInfo, hashers, capture.settings, record, filename)
+
+                if self.sidecar == "file":
+                    if filename is not None:
+                        _writeSidecar(filename, sidecar)
+                else:
+                    self.sidecar(sidecar)
+
+        except Exception as error:
+            capture.itemDone(index, error=error)
+
+        else:
+            capture.itemDone(index, result)
+
+        finally:
+            _release(ref)
+
+
     # --------- Property (getter and setters) functions ---------
     @property
     def imageQuality(self):
@@ -228,24 +314,206 @@ class EOSCamera:
         return _AFMode(_getPropertyData(self._cameraRef, _PropertyID._AFMode, 0)).label
 
 
-    # --------- End users functions ---------
-    def shot(self, filename: str = None):
-        # Updating filename output, if it is required
-        if filename != None: self.filename = filename 
+    # --------- Capture functions ---------
+    def _takePicture(self, timeout: float = 5.):
+        # The camera answers busy while it is still processing the previous
+        # exposure: the command is sent again until it is accepted
+        start = time.monotonic()
+        while True:
+            try:
+                _sendCommand(self._cameraRef, _CameraCommand._TakePicture, 0)
+                return
+
+            except CanonError as err:
+                if err.code != _ErrorCode.ERR_DEVICE_BUSY or time.monotonic() - start > timeout:
+                    raise
+
+            self._pumpEvents()
+
+    def _exposureSettings(self) -> dict:
+        # Recorded in sidecars, as set when the picture is taken
+        return {
+            "shutterSpeed": self.shutterSpeed,
+            "aperture"    : self.aperture,
+            "isoSpeed"    : self.isoSpeed,
+            "afMode"      : self.afMode,
+        }
+
+    def _downloadTargetsFor(self, memoryDownloads: list, sink, chunkSize: int) -> list:
+        # One target per item the camera will transfer: two of them when the
+        # image quality has a secondary image (RAW+JPEG)
+        itemCount = _itemsPerShot(_getPropertyData(self._cameraRef, _PropertyID._ImageQuality, 0))
+
+        # In memory, the image is returned as a read-only memoryview over the
+        # memory downloads of the capture, which remains valid until the next
+        # shot downloaded in memory has completed. With a sink
+        # (file object, socket, hash object, generator or callable), it is
+        # streamed to it chunk by chunk, and the sink is returned.
+        if sink is not None:
+            if itemCount > 1:
+                raise ValueError("A sink cannot receive the several items of a RAW+JPEG capture")
+            return [_SinkDownload(sink, chunkSize)]
+        if memoryDownloads is not None:
+            return memoryDownloads[:itemCount]
+
+        # Data goes through Python only with a host writer: one is created
+        # when digests are required
+        writer = self.hostWriter
+        if writer is None and self.digests:
+            if self._digestWriter is None:
+                self._digestWriter = HostFileWriter()
+            writer = self._digestWriter
+
+        # Items of a multi-item capture are named after the filename, with
+        # their own extension
+        return [_FileDownload(self._filename, itemCount > 1, writer) for _ in range(itemCount)]
+
 
-        # Preparing the synchronization event
-        self._downloadEvent = threading.Event()
+    # --------- End users functions ---------
+    def shot(self, filename: str = None, inMemory: bool = False, sink=None, chunkSize: int = 1024 * 1024):
+        future = self.shotAsync(filename, inMemory, sink, chunkSize)
+
+        try:
+            self._waitDone(future)
+        except TimeoutError:
+            self._captures.abandon(future)
+            raise
+
+        result = future.result()
+        if inMemory or sink is not None:
+            return result
+
+    def wait(self, future: concurrent.futures.Future, timeout: float = 15.):
+        # Waits for a future of shotAsync(), and returns its result. On
+        # Windows, its items are only transferred while the thread which
+        # initialized the SDK waits: that thread must wait for the futures.
+        self._waitDone(future, timeout)
+        return future.result()
+
+    def _waitDone(self, future: concurrent.futures.Future, timeout: float = 15.):
+        done = threading.Event()
+        future.add_done_callback(lambda _: done.set())
+        _waitForEvent(done, timeout)
+
+    def shotAsync(self, filename: str = None, inMemory: bool = False, sink=None,
+                  chunkSize: int = 1024 * 1024, timeout: float = None) -> concurrent.futures.Future:
+        # Returns as soon as the camera accepted the exposure: the download
+        # completes in background, and the future gets the filename,
+        # memoryview or sink, or a list of them for a RAW+JPEG capture. When
+        # maxCapturesInFlight captures are still downloading, waits for one
+        # of them to complete first. On Windows, the future completes while
+        # the thread which initialized the SDK waits (see wait()).
+        if filename != None: self.filename = filename
+
+        # Memory downloads are taken for the capture, and given back with it
+        memoryDownloads = self._memoryDownloads.acquire(timeout) if inMemory and sink is None else None
+        try:
+            targets  = self._downloadTargetsFor(memoryDownloads, sink, chunkSize)
+            settings = self._exposureSettings() if self.sidecar is not None else None
+            future   = self._captures.submit(self._takePicture, targets, timeout, settings)
+
+        except BaseException:
+            if memoryDownloads is not None:
+                self._memoryDownloads.giveBack(memoryDownloads)
+            raise
+
+        if memoryDownloads is not None:
+            future.add_done_callback(lambda _: self._memoryDownloads.giveBack(memoryDownloads))
+        return future
+
+    async def shotAwaitable(self, filename: str = None, inMemory: bool = False, sink=None,
+                            chunkSize: int = 1024 * 1024):
+        # Waiting for a free capture slot is blocking, it is done off the loop
+        loop   = asyncio.get_running_loop()
+        future = await loop.run_in_executor(
+            None, functools.partial(self.shotAsync, filename, inMemory, sink, chunkSize))
+
+        # On Windows, the thread running the loop must be the one which
+        # initialized the SDK: it pumps the messages until the download ends
+        while _hasMessageQueue() and not future.done():
+            _pumpWindowsMessages()
+            await asyncio.sleep(0.005)
+
+        return await asyncio.wrap_future(future)
 
-        _sendCommand(self._cameraRef, _CameraCommand._TakePicture, 0)
-        _waitForEvent(self._downloadEvent)
+    @property
+    def capturesInFlight(self) -> int:
+        return self._captures.inFlight
 
-        self._downloadEvent = None
+    @property
+    def captureMetrics(self) -> CaptureMetrics:
+        # Per-phase timings and throughput of the captured items, with their
+        # export (setExporter, openMetrics)
+        return self._captureMetrics
+
+    def captureStats(self) -> dict:
+        return self._captureMetrics.stats()
+
+    def burst(self, count: int = None, duration: float = None, template: str = "burst_{index:05d}{ext}",
+              writers: int = 4, maxQueued: int = 16, settle: float = 1., timeout: float = 15.) -> BurstReport:
+        # Continuous shooting: the shutter button is held down until count
+        # shots were transferred (all of their items, e.g. RAW+JPEG), or for
+        # duration seconds. Files are named from the template, with the
+        # fields index, name and ext (taken from the file name on the camera).
+        if count is None and duration is None:
+            raise ValueError("A burst needs a frame count or a duration")
+
+        itemCount = _itemsPerShot(_getPropertyData(self._cameraRef, _PropertyID._ImageQuality, 0))
+
+        burst = _Burst(template, writers, maxQueued, itemCount)
+        self._burst = burst
+        try:
+            burst.start()
+            _sendCommand(self._cameraRef, _CameraCommand._PressShutterButton, _ShutterButton._Completely)
+            try:
+                while not burst.done(count, duration):
+                    self._pumpEvents()
+                    if time.monotonic() - burst.lastTransfer > timeout:
+                        raise TimeoutError(f"No item transferred for {timeout} seconds")
 
-    def liveViewStream(self, callback=None, errorCallback=None) -> LiveViewStream:
+            finally:
+                _sendCommand(self._cameraRef, _CameraCommand._PressShutterButton, _ShutterButton._OFF)
+
+            # Images still in the camera buffer keep coming once released
+            while time.monotonic() - burst.lastTransfer < settle:
+                self._pumpEvents()
+
+        except BaseException:
+            # Error of the burst is raised, not the ones of its downloads
+            self._burst = None
+            burst.close()
+            raise
+
+        self._burst = None
+        return burst.finish()
+
+    def _pumpEvents(self):
+        # Lets the SDK deliver the pending events
+        _pumpWhileWaiting(0.1)
+
+    def volumes(self, refresh: bool = False) -> list:
+        # Memory cards of the camera, whose trees are enumerated lazily and
+        # cached: refresh to see the items added or removed meanwhile
+        if refresh and self._volumes is not None:
+            for volume in self._volumes:
+                volume.release()
+            self._volumes = None
+
+        if self._volumes is None:
+            self._volumes = _readVolumes(self._cameraRef)
+        return self._volumes
+
+    def syncCards(self, destination: str, **options) -> SyncReport:
+        # Downloads the items of the cards not synced yet to the destination
+        # (see CardSync for the options)
+        with CardSync(self, destination, **options) as sync:
+            return sync.run()
+
+    def liveViewStream(self, callback=None, errorCallback=None, **options) -> LiveViewStream:
         if self._liveViewStream is not None:
             self._liveViewStream.stop()
 
-        stream = LiveViewStream(self)
+        stream = LiveViewStream(self, **options)
         self._liveViewStream = stream
         stream.start(callback=callback, errorCallback=errorCallback)
 
@@ -266,9 +534,19 @@ class EOSCamera:
                 finally:
                     self._liveViewStream = None
 
+            self._itemDownloads.shutdown(wait=True)
+            self._memoryDownloads.release()
+            if self._digestWriter is not None:
+                self._digestWriter.close()
+            for volume in self._volumes or []:
+                volume.release()
+
             _release(self._flashRef)
             _closeSession(self._cameraRef)
             _release(self._cameraRef)
+            if self._eventPump is not None:
+                _releaseEventPump()
+                self._eventPump = None
             _SDK._terminate()
 
             self._isClosed = True
@@ -0,0 +1,170 @@
+import threading, time
+
+from collections        import deque
+from concurrent.futures import Future
+
+
+def _itemsPerShot(imageQuality: int) -> int:
+    # Image quality holds the primary image in its upper half, and the
+    # secondary one (e.g. the JPEG of RAW+JPEG) in its lower half, its size
+    # being 0xFF when there is none
+    return 1 if (imageQuality >> 8) & 0xFF == 0xFF else 2
+
+
+class _Capture:
+    # One exposure, made of one download target per expected item. The
+    # future completes once every item has landed, with the result of the
+    # only target, or the list of all of them (in transfer order).
+    def __init__(self, targets: list, timeout: float):
+        self.targets  = targets
+        self.future   = Future()
+        self.deadline = time.monotonic() + timeout
+        self.claimed  = 0
+
+        # Shutter command sent, and accepted by the camera, and the settings
+        # of the camera at that time
+        self.triggered = None
+        self.accepted  = None
+        self.settings  = None
+
+        self._lock      = threading.Lock()
+        self._results   = [None] * len(targets)
+        self._remaining = len(targets)
+        self._error     = None
+
+    @property
+    def expected(self) -> int:
+        return len(self.targets)
+
+    def itemDone(self, index: int, result=None, error: Exception = None):
+        with self._lock:
+            self._results[index] = result
+            self._error          = self._error or error
+            self._remaining     -= 1
+            if self._remaining:
+                return
+
+        # Capture may have expired meanwhile
+        if self.future.done():
+            return
+        if self._error is not None:
+            self.future.set_exception(self._error)
+        else:
+            self.future.set_result(self._results[0] if self.expected == 1 else self._results)
+
+
+class _CapturePipeline:
+    # Captures triggered but not yet downloaded. The camera transfers items
+    # in the order the pictures were taken, so each transfer request is
+    # matched to the oldest pending capture, until it got all its items.
+    # While captures are in flight, a thread expires the ones never
+    # transferred (SDK events themselves are delivered by the event pump).
+    def __init__(self, maxInFlight: int = 2, timeout: float = 15., expiryInterval: float = 0.005):
+        if maxInFlight < 1:
+            raise ValueError("At least one capture must be allowed in flight")
+
+        self._timeout        = timeout
+        self._expiryInterval = expiryInterval
+
+        self._lock     = threading.Lock()
+        self._pending  = deque()
+        self._slots    = threading.BoundedSemaphore(maxInFlight)
+        self._inFlight = 0
+        self._thread   = None
+
+        self.maxInFlight = maxInFlight
+
+
+    @property
+    def inFlight(self) -> int:
+        return self._inFlight
+
+    def submit(self, trigger, targets: list, timeout: float = None, settings: dict = None) -> Future:
+        # Blocks while the maximum number of captures are in flight
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError(f"No capture slot freed after {timeout} seconds")
+
+        capture = _Capture(targets, self._timeout)
+        capture.settings = settings
+        with self._lock:
+            self._pending.append(capture)
+            self._inFlight += 1
+
+        try:
+            capture.triggered = time.monotonic()
+            trigger()
+            capture.accepted  = time.monotonic()
+        except BaseException:
+            with self._lock:
+                self._pending.remove(capture)
+            self._finish()
+            raise
+
+        capture.future.add_done_callback(lambda _: self._finish())
+        self._startExpiry()
+
+        return capture.future
+
+    def next(self) -> tuple:
+        # Called from the object event handler, when an item is transferred:
+        # returns the capture it belongs to, and the index of the item
+        with self._lock:
+            if not self._pending:
+                return None, None
+
+            capture = self._pending[0]
+            index   = capture.claimed
+
+            capture.claimed += 1
+            if capture.claimed == capture.expected:
+                self._pending.popleft()
+
+            return capture, index
+
+    def abandon(self, future: Future) -> None:
+        with self._lock:
+            for capture in self._pending:
+                if capture.future is future:
+                    self._pending.remove(capture)
+                    break
+            else:
+                return
+
+        if not capture.future.done():
+            capture.future.set_exception(TimeoutError("Captured item was never transferred"))
+
+    def _finish(self):
+        with self._lock:
+            self._inFlight -= 1
+        self._slots.release()
+
+
+    # --------- Expiry ---------
+    def _startExpiry(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._expireWhileInFlight, daemon=True)
+                self._thread.start()
+
+    def _expireWhileInFlight(self):
+        while True:
+            with self._lock:
+                if not self._inFlight:
+                    self._thread = None
+                    return
+
+            self._expire()
+            time.sleep(self._expiryInterval)
+
+    def _expire(self):
+        # Oldest captures first: pictures never transferred (e.g. autofocus
+        # failure) would otherwise be matched with the next ones
+        now = time.monotonic()
+        with self._lock:
+            expired = []
+            while self._pending and self._pending[0].deadline < now:
+                expired.append(self._pending.popleft())
+
+        for capture in expired:
+            if not capture.future.done():
+                capture.future.set_exception(TimeoutError("Captured item was never transferred"))
@@ -0,0 +1,129 @@
+import json, threading
+
+from array       import array
+from collections import namedtuple
+
+from .live_view_metrics import _RollingWindow
+
+
+# Monotonic timestamps of a downloaded item, from the shutter command to the
+# end of its download, and its size (bytes)
+CaptureRecord = namedtuple("CaptureRecord",
+    ["triggered", "accepted", "requested", "started", "downloaded", "completed", "size"])
+
+
+def _phaseDurations(record: CaptureRecord) -> dict:
+    # Phases of a capture (seconds):
+    #  - shutter        : TakePicture command, until accepted by the camera
+    #  - transferRequest: exposure and processing, until the transfer request
+    #  - queue          : transfer request, until the download starts
+    #  - download       : transfer of the data from the camera
+    #  - complete       : download completion, and file close
+    #  - total          : from the shutter command to the item on the host
+    return {
+        "shutter"        : record.accepted   - record.triggered,
+        "transferRequest": record.requested  - record.accepted,
+        "queue"          : record.started    - record.requested,
+        "download"       : record.downloaded - record.started,
+        "complete"       : record.completed  - record.downloaded,
+        "total"          : record.completed  - record.triggered,
+    }
+
+
+class CaptureMetrics:
+    # Capture timeline of the last downloaded items. Records are kept in a
+    # flat ring of doubles, phases and throughput (MB/s over the download
+    # phase) in rolling windows.
+    _phases = ("shutter", "transferRequest", "queue", "download", "complete", "total")
+
+    def __init__(self, size: int = 1024):
+        self._lock    = threading.Lock()
+        self._size    = size
+        self._records = array("d", bytes(8 * len(CaptureRecord._fields) * size))
+        self._index   = 0
+        self._count   = 0
+
+        self._windows    = {name: _RollingWindow(size) for name in self._phases + ("throughput",)}
+        self._itemCount  = 0
+        self._byteCount  = 0
+
+        # Optional hook, called with each record from the download thread
+        self._exporter = None
+
+
+    def setExporter(self, exporter) -> None:
+        self._exporter = exporter
+
+    def record(self, record: CaptureRecord) -> None:
+        durations = _phaseDurations(record)
+
+        with self._lock:
+            width  = len(CaptureRecord._fields)
+            offset = self._index * width
+            self._records[offset:offset + width] = array("d", record)
+
+            self._index = (self._index + 1) % self._size
+            self._count = min(self._count + 1, self._size)
+
+            for phase, duration in durations.items():
+                self._windows[phase].add(duration)
+            if durations["download"] > 0:
+                self._windows["throughput"].add(record.size / durations["download"] / 1e6)
+
+            self._itemCount += 1
+            self._byteCount += int(record.size)
+
+        if self._exporter is not None:
+            self._exporter(record)
+
+    def records(self) -> list:
+        # Oldest first
+        with self._lock:
+            width = len(CaptureRecord._fields)
+            first = (self._index - self._count) % self._size
+            return [CaptureRecord(*self._records[slot * width:(slot + 1) * width])
+                    for slot in ((first + n) % self._size for n in range(self._count))]
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {name: window.summary() for name, window in self._windows.items()}
+            stats["items"] = self._itemCount
+            stats["bytes"] = self._byteCount
+        return stats
+
+
+    # --------- Export ---------
+    def openMetrics(self) -> str:
+        # Phases as summaries, in the OpenMetrics text format
+        lines = ["# TYPE pyedsdk_capture_phase_seconds summary",
+                 "# UNIT pyedsdk_capture_phase_seconds seconds"]
+
+        with self._lock:
+            summaries = {phase: (self._windows[phase].summary(), len(self._windows[phase]))
+                         for phase in self._phases}
+            itemCount, byteCount = self._itemCount, self._byteCount
+
+        for phase, (summary, count) in summaries.items():
+            if summary is None:
+                continue
+            for percentile in (50, 90, 99):
+                lines.append(f'pyedsdk_capture_phase_seconds{{phase="{phase}",quantile="{percentile / 100}"}} '
+                             f'{summary[f"p{percentile}"]}')
+            lines.append(f'pyedsdk_capture_phase_seconds_sum{{phase="{phase}"}} {summary["mean"] * count}')
+            lines.append(f'pyedsdk_capture_phase_seconds_count{{phase="{phase}"}} {count}')
+
+        lines += ["# TYPE pyedsdk_capture_items counter",
+                  f"pyedsdk_capture_items_total {itemCount}",
+                  "# TYPE pyedsdk_capture_bytes counter",
+                  "# UNIT pyedsdk_capture_bytes bytes",
+                  f"pyedsdk_capture_bytes_total {byteCount}",
+                  "# EOF"]
+
+        return "\n".join(lines) + "\n"
+
+
+def jsonLinesExporter(file):
+    # Exporter writing each record, with its phase durations, as a JSON line
+    def export(record: CaptureRecord):
+        file.write(json.dumps({**record._asdict(), **_phaseDurations(record)}) + "\n")
+    return export
@@ -0,0 +1,185 @@
+import threading
+
+from fnmatch import fnmatchcase
+
+from .core._functions import _getChildCount, _getChildAtIndex, _getVolumeInfo, _getDirectoryItemInfo
+from .core._functions import _deleteDirectoryItem, _release
+
+from .core._types     import _BaseRef, _DirectoryItemInfo, _VolumeInfo
+
+from .download        import _FileDownload
+
+
+class CardItem:
+    # File or folder of a memory card. Its information is read once, when
+    # its parent folder is enumerated, and the children of a folder are only
+    # enumerated (then cached) when first needed: queries walk the card once.
+    def __init__(self, ref: _BaseRef, info: _DirectoryItemInfo, parent, lock: threading.RLock):
+        self._ref      = ref
+        self._children = None
+        self._lock     = lock
+
+        self.info   = info
+        self.parent = parent
+        self.name   = info.szFileName.decode(errors="replace")
+
+    @property
+    def isFolder(self) -> bool:
+        return bool(self.info.isFolder)
+
+    @property
+    def size(self) -> int:
+        return self.info.size
+
+    @property
+    def format(self) -> int:
+        return self.info.format
+
+    @property
+    def dateTime(self) -> int:
+        return self.info.dateTime
+
+    @property
+    def path(self) -> str:
+        return f"{self.parent.path.rstrip('/')}/{self.name}"
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.path}>"
+
+
+    # --------- Tree browsing ---------
+    @property
+    def children(self) -> list:
+        # Copy taken under the lock: items may be deleted while iterating
+        with self._lock:
+            if self._children is None:
+                self._children = self._enumerate() if self.isFolder else []
+            return list(self._children)
+
+    def _enumerate(self) -> list:
+        children = []
+        for index in range(_getChildCount(self._ref)):
+            ref = _getChildAtIndex(self._ref, index)
+            children.append(CardItem(ref, _getDirectoryItemInfo(ref), self, self._lock))
+        return children
+
+    def __iter__(self):
+        return iter(self.children)
+
+    def __getitem__(self, name: str):
+        for child in self.children:
+            if child.name.lower() == name.lower():
+                return child
+        raise KeyError(f"No '{name}' in {self.path}")
+
+    def walk(self):
+        # Every item below this one, depth first
+        for child in self.children:
+            yield child
+            if child.isFolder:
+                yield from child.walk()
+
+    def find(self, predicate):
+        return (item for item in self.walk() if predicate(item))
+
+    def glob(self, pattern: str):
+        # Pattern relative to this item, such as "DCIM/*/*.CR3" or "**/*.JPG".
+        # Names are matched regardless of case, as cards use upper case.
+        # Only the folders matching the pattern are enumerated.
+        return self._glob([part.lower() for part in pattern.strip("/").split("/")])
+
+    def _glob(self, parts: list):
+        part, rest = parts[0], parts[1:]
+
+        if part == "**":
+            if not rest:
+                yield from self.walk()
+                return
+
+            # Zero or more folders
+            yield from self._glob(rest)
+            for child in self.children:
+                if child.isFolder:
+                    yield from child._glob(parts)
+            return
+
+        for child in self.children:
+            if fnmatchcase(child.name.lower(), part):
+                if not rest:
+                    yield child
+                elif child.isFolder:
+                    yield from child._glob(rest)
+
+    def refresh(self):
+        # Forgets the cached children, to see the changes made on the card
+        with self._lock:
+            if self._children is not None:
+                for child in self._children:
+                    child.release()
+                self._children = None
+
+
+    # --------- Download and release ---------
+    def download(self, filename: str, writer=None, hashers: dict = None) -> str:
+        # With a HostFileWriter, hash objects can be updated while downloading
+        if self.isFolder:
+            raise IsADirectoryError(f"{self.path} is a folder")
+
+        return _FileDownload(filename, writer=writer)(self._ref, self.info, None, hashers)
+
+    def delete(self):
+        # Deletes the item from the card
+        with self._lock:
+            self.refresh()
+            _deleteDirectoryItem(self._ref)
+            _release(self._ref)
+            self._ref = None
+
+            if self.parent is not None and self.parent._children is not None:
+                self.parent._children.remove(self)
+
+    def release(self):
+        with self._lock:
+            self.refresh()
+            if self._ref is not None:
+                _release(self._ref)
+                self._ref = None
+
+
+class CardVolume(CardItem):
+    # Memory card of the camera, root of its items
+    def __init__(self, ref: _BaseRef, info: _VolumeInfo):
+        self._ref      = ref
+        self._children = None
+        self._lock     = threading.RLock()
+
+        self.info   = info
+        self.parent = None
+        self.name   = info.szVolumeLabel.decode(errors="replace")
+
+    @property
+    def isFolder(self) -> bool:
+        return True
+
+    @property
+    def size(self) -> int:
+        return self.info.maxCapacity
+
+    @property
+    def freeSpace(self) -> int:
+        return self.info.freeSpaceInBytes
+
+    @property
+    def path(self) -> str:
+        return "/"
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.name}>"
+
+
+def _readVolumes(cameraRef: _BaseRef) -> list:
+    volumes = []
+    for index in range(_getChildCount(cameraRef)):
+        ref = _getChildAtIndex(cameraRef, index)
+        volumes.append(CardVolume(ref, _getVolumeInfo(ref)))
+    return volumes
@@ -0,0 +1,194 @@
+import os, queue, sqlite3, threading, time
+
+from collections import namedtuple
+
+from .download import HostFileWriter
+from .sidecar  import _hashers
+
+
+SyncReport = namedtuple("SyncReport", ["scanned", "skipped", "downloaded", "deleted", "failed", "bytes", "duration"])
+
+_schema = """
+CREATE TABLE IF NOT EXISTS items (
+    folder    TEXT    NOT NULL,
+    name      TEXT    NOT NULL,
+    size      INTEGER NOT NULL,
+    dateTime  INTEGER NOT NULL,
+    state     TEXT    NOT NULL,
+    localPath TEXT,
+    digest    TEXT,
+    syncedAt  REAL,
+    PRIMARY KEY (folder, name, size, dateTime)
+)
+"""
+
+_stop = object()
+
+
+class CardSync:
+    # Copies the new items of the memory cards to a host folder. Synced items
+    # are recorded in a sqlite index, keyed by folder, name, size and date:
+    # only the items missing from it are downloaded. Items are recorded one
+    # by one as they land, so that an interrupted sync goes on from where it
+    # stopped. Files are first written as .part, and renamed once verified.
+    #
+    # Pipeline: a scanner thread walks the cards (through the cached tree),
+    # download workers get the items from a bounded queue, and the caller's
+    # thread records them in the index (and deletes them from the card).
+    def __init__(self, camera, destination: str, index: str = None, pattern: str = "**",
+                 workers: int = 1, queueSize: int = 16, digest: str = "sha256", delete: bool = False):
+        self._camera      = camera
+        self._destination = destination
+        self._pattern     = pattern
+        self._workers     = workers
+        self._queueSize   = queueSize
+        self._digest      = digest
+        self._delete      = delete
+        self._stopping    = threading.Event()
+
+        os.makedirs(destination, exist_ok=True)
+        self._db = sqlite3.connect(index or os.path.join(destination, ".pyedsdk-sync.sqlite"),
+                                   check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(_schema)
+        self._db.commit()
+
+
+    def stop(self):
+        # Items being downloaded are finished, the next ones are left for the
+        # next sync
+        self._stopping.set()
+
+    def run(self) -> SyncReport:
+        self._stopping.clear()
+        start  = time.monotonic()
+        counts = dict(scanned=0, skipped=0, downloaded=0, deleted=0, failed=0, bytes=0)
+
+        synced = {row[:4]: row[4:] for row in
+                  self._db.execute("SELECT folder, name, size, dateTime, state, localPath, digest FROM items")}
+
+        items   = queue.Queue(self._queueSize)
+        results = queue.Queue(self._queueSize)
+
+        # Error of the scanner, raised once the items found were recorded
+        scanErrors = []
+        scanner    = threading.Thread(target=self._scan, args=(synced, items, results, counts, scanErrors),
+                                      daemon=True)
+        workers = [threading.Thread(target=self._downloadItems, args=(items, results), daemon=True)
+                   for _ in range(self._workers)]
+        scanner.start()
+        for worker in workers:
+            worker.start()
+
+        finished = 0
+        while finished < self._workers:
+            result = results.get()
+            if result is _stop:
+                finished += 1
+                continue
+
+            entry, localPath, digest, error, downloaded = result
+            if error is not None:
+                counts["failed"] += 1
+                continue
+
+            volume, item = entry
+            if downloaded:
+                self._record(entry, "done", localPath, digest)
+                counts["downloaded"] += 1
+                counts["bytes"]      += item.size
+
+            if self._delete:
+                try:
+                    item.delete()
+                    self._record(entry, "deleted", localPath, digest)
+                    counts["deleted"] += 1
+                except Exception:
+                    counts["failed"] += 1
+
+        scanner.join()
+        if scanErrors:
+            raise scanErrors[0]
+
+        return SyncReport(duration=time.monotonic() - start, **counts)
+
+
+    # --------- Pipeline stages ---------
+    def _scan(self, synced: dict, items: queue.Queue, results: queue.Queue, counts: dict, errors: list):
+        try:
+            # Tree is read again, to see the items taken since last sync
+            for volume in self._camera.volumes(refresh=True):
+                for item in volume.glob(self._pattern):
+                    if self._stopping.is_set():
+                        return
+                    if item.isFolder:
+                        continue
+
+                    counts["scanned"] += 1
+                    if _key(volume, item) in synced:
+                        state, localPath, digest = synced[_key(volume, item)]
+
+                        # Downloaded by an interrupted sync, but not deleted yet
+                        if self._delete and state == "done":
+                            results.put(((volume, item), localPath, digest, None, False))
+                        else:
+                            counts["skipped"] += 1
+                        continue
+
+                    items.put((volume, item))
+        except Exception as error:
+            errors.append(error)
+        finally:
+            for _ in range(self._workers):
+                items.put(_stop)
+
+    def _downloadItems(self, items: queue.Queue, results: queue.Queue):
+        # Each worker has its own writer, as a writer serializes its files.
+        # Files are synced before being recorded when they are then deleted.
+        writer = HostFileWriter(fsync="file" if self._delete else "never")
+        try:
+            while (entry := items.get()) is not _stop:
+                volume, item = entry
+                try:
+                    localPath, digest = self._download(volume, item, writer)
+                    results.put((entry, localPath, digest, None, True))
+                except Exception as error:
+                    results.put((entry, None, None, error, False))
+        finally:
+            writer.close()
+            results.put(_stop)
+
+    def _download(self, volume, item, writer: HostFileWriter) -> tuple:
+        localPath = os.path.join(self._destination, volume.name, *item.path.strip("/").split("/"))
+        partPath  = localPath + ".part"
+        os.makedirs(os.path.dirname(localPath), exist_ok=True)
+
+        # Writer fails (and removes the .part file) unless it received every
+        # byte of the item: the size of the file, preallocated, proves nothing
+        hashers = _hashers([self._digest] if self._digest else [])
+        item.download(partPath, writer, hashers)
+        os.replace(partPath, localPath)
+
+        digest = hashers[self._digest].hexdigest() if self._digest else None
+        return localPath, digest
+
+    def _record(self, entry: tuple, state: str, localPath: str, digest: str):
+        volume, item = entry
+        self._db.execute("INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                         (*_key(volume, item), state, localPath, digest, time.time()))
+        self._db.commit()
+
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exceptionType, exceptionValue, traceback):
+        self.close()
+
+
+def _key(volume, item) -> tuple:
+    # Folder includes the card, as several cards may hold the same names
+    return (volume.name + item.parent.path, item.name, item.size, item.dateTime)
@@ -1,4 +1,5 @@
 import ctypes
+import threading
 import time
 
 from ._errors import _ErrorCode
@@ -6,14 +7,18 @@ from ._types  import _BaseRef
 from ._types  import _ObjectEvent, _PropertyEvent
 
 
-_ObjectEventHandler = ctypes.WINFUNCTYPE(
+# SDK callbacks use the stdcall convention on Windows. Elsewhere, cdecl is
+# used so that the module can still be imported (e.g. for tests).
+_FUNCTYPE = getattr(ctypes, "WINFUNCTYPE", ctypes.CFUNCTYPE)
+
+_ObjectEventHandler = _FUNCTYPE(
     ctypes.c_uint32,   # _ErrorCode
     ctypes.c_uint32,   # _ObjectEvent
     _BaseRef,
     ctypes.c_void_p
 )
 
-_PropertyEventHandler = ctypes.WINFUNCTYPE(
+_PropertyEventHandler = _FUNCTYPE(
     ctypes.c_uint32, # _ErrorCode
     ctypes.c_uint32, # _PropertyEvent
     ctypes.c_uint32, # _PropertyID
@@ -22,7 +27,14 @@ _PropertyEventHandler = ctypes.WINFUNCTYPE(
 )
 
 _PM_REMOVE = 0x0001
-_user32    = ctypes.windll.user32
+_user32    = None
+
+def _getUser32():
+    # Loaded on first use only, as it does not exist outside of Windows
+    global _user32
+    if _user32 is None:
+        _user32 = ctypes.windll.user32
+    return _user32
 
 class MSG(ctypes.Structure):
     _fields_ = [
@@ -35,20 +47,142 @@ class MSG(ctypes.Structure):
         ("pt_y"   , ctypes.c_long),
 ]
 
+
+# --------- Event pump backends ---------
+# A backend is any callable delivering the pending SDK events from the pump
+# thread: EdsGetEvent (_functions._getEvent), or nothing at all. Windows
+# messages are pumped by the waiting threads instead (see _waitForEvent), as
+# events are only dispatched to the thread which initialized the SDK.
 def _pumpWindowsMessages():
-    msg = MSG()
+    if not hasattr(ctypes, "windll"):
+        return # No message queue outside of Windows
+
+    user32 = _getUser32()
+    msg    = MSG()
 
-    while _user32.PeekMessageW(
+    while user32.PeekMessageW(
         ctypes.byref(msg), None, 0, 0, _PM_REMOVE):
-        _user32.TranslateMessage(ctypes.byref(msg))
-        _user32.DispatchMessageW(ctypes.byref(msg))
+        user32.TranslateMessage(ctypes.byref(msg))
+        user32.DispatchMessageW(ctypes.byref(msg))
+
+def _pumpNothing():
+    pass
+
+def _hasMessageQueue() -> bool:
+    # On Windows, the SDK dispatches its events through the message queue of
+    # the thread which initialized it: only that thread can pump them
+    return hasattr(ctypes, "windll")
+
+
+class _EventPump:
+    # Runs a backend on a background thread at a fixed cadence, so that SDK
+    # events are delivered even when nobody waits for them. Handlers are
+    # called from this thread: waiters are woken up as soon as they set
+    # their event, instead of on their next polling interval.
+    def __init__(self, backend, interval: float = 0.005):
+        self.backend  = backend
+        self.interval = interval
+
+        self._stopping = threading.Event()
+        self._tick     = threading.Condition()
+        self._ticks    = 0
+        self._users    = 0
+        self._thread   = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="pyedsdk-event-pump", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stopping.set()
+            if self._thread is not threading.current_thread():
+                self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                self.backend()
+            except Exception:
+                pass # Events are pumped again on next iteration
+
+            with self._tick:
+                self._ticks += 1
+                self._tick.notify_all()
+
+            self._stopping.wait(self.interval)
+
+    def waitTick(self, timeout: float = None) -> bool:
+        # Waits for the backend to run once more
+        with self._tick:
+            target = self._ticks + 1
+            return self._tick.wait_for(
+                lambda: self._ticks >= target or self._stopping.is_set(), timeout)
+
+
+# Event pump shared by every camera, running while one of them is open
+_eventPump     = None
+_eventPumpLock = threading.Lock()
+
+def _acquireEventPump(backend, interval: float = 0.005) -> _EventPump:
+    # The pump is shared by every camera: later users must ask for the same
+    # backend and interval as the one which started it
+    global _eventPump
+    with _eventPumpLock:
+        if _eventPump is None:
+            _eventPump = _EventPump(backend, interval)
+            _eventPump.start()
+
+        elif (backend, interval) != (_eventPump.backend, _eventPump.interval):
+            raise ValueError(f"Event pump already running with backend {_eventPump.backend!r} "
+                             f"every {_eventPump.interval} seconds")
+        _eventPump._users += 1
+        return _eventPump
+
+def _releaseEventPump():
+    global _eventPump
+    with _eventPumpLock:
+        if _eventPump is None:
+            return
+        _eventPump._users -= 1
+        if _eventPump._users <= 0:
+            _eventPump.stop()
+            _eventPump = None
+
 
 def _waitForEvent(event, timeout=15):
-    start = time.time()
+    # Windows messages are always pumped here, as no other thread can do it.
+    # Elsewhere, with the pump thread running, the event is set from its
+    # thread as soon as the SDK delivers it.
+    pump = _eventPump
+    if not _hasMessageQueue() and pump is not None and pump.running:
+        if not event.wait(timeout):
+            raise TimeoutError(f"EDSDK event timeout after {timeout} seconds")
+        return
 
+    start = time.monotonic()
     while not event.is_set():
         _pumpWindowsMessages()
-        time.sleep(0.01)
+        if event.wait(0.005):
+            break
 
-        if time.time() - start > timeout:
+        if time.monotonic() - start > timeout:
             raise TimeoutError(f"EDSDK event timeout after {timeout} seconds")
+
+def _pumpWhileWaiting(timeout: float = 0.1):
+    # Lets the SDK deliver its pending events while the calling thread waits
+    # (for one pump tick, when the pump thread delivers them)
+    pump = _eventPump
+    if not _hasMessageQueue() and pump is not None and pump.running:
+        pump.waitTick(timeout)
+        return
+
+    _pumpWindowsMessages()
+    time.sleep(min(timeout, 0.005))
@@ -6,7 +6,7 @@ from ._errors    import _error_restype, _ErrorCode
 
 from ._types     import _BaseRef, _CameraListRef, _CameraRef, _VolumeRef, _FlashRef, _DirectoryItemRef, _StreamRef, _EvfImageRef
 from ._types     import _DeviceInfo, _VolumeInfo, _DirectoryItemInfo, _PropertyDesc, _Capacity
-from ._types     import _Access, _CameraCommand, _CameraStatusCommand, _ObjectEvent, _PropertyEvent, _FileCreateDisposition, _PropertyID
+from ._types     import _Access, _CameraCommand, _CameraStatusCommand, _ObjectEvent, _PropertyEvent, _FileCreateDisposition, _PropertyID, _SeekOrigin
 
 from ._callbacks import _ObjectEventHandler, _PropertyEventHandler
 
@@ -14,7 +14,7 @@ from ._callbacks import _ObjectEventHandler, _PropertyEventHandler
 from ._lib import lib
 
 
-# Number of functions binded: 30 / 56
+# Number of functions binded: 34 / 56
 
 
 # -------- Basic functions --------
@@ -67,7 +67,24 @@ def _getChildAtIndex(ref: _BaseRef, index: int):
 
 
 # -------- Property operating functions --------
-# Number of functions binded: 3 / 5
+# Number of functions binded: 4 / 5
+
+# Defining EdsError EDSAPI EdsGetPropertySize(EdsBaseRef    inRef,
+#                                             EdsPropertyID inPropertyID,
+#                                             EdsInt32      inParam,
+#                                             EdsDataType*  outDataType,
+#                                             EdsUInt32*    outSize)
+lib.EdsGetPropertySize.restype  =  _error_restype
+lib.EdsGetPropertySize.argtypes = [_BaseRef, ctypes.c_uint32, ctypes.c_int32, ctypes.POINTER(ctypes.c_uint32), ctypes.POINTER(ctypes.c_uint32)]
+def _getPropertySize(ref: _BaseRef, propertyID: _PropertyID, additionalParam: int) -> tuple[int, int]:
+    dataType = ctypes.c_uint32()
+    size     = ctypes.c_uint32()
+    lib.EdsGetPropertySize(ref,
+                           ctypes.c_uint32(int(propertyID)),
+                           ctypes.c_int32(additionalParam),
+                           ctypes.byref(dataType),
+                           ctypes.byref(size))
+    return int(dataType.value), int(size.value)
 
 # Defining EdsError EDSAPI EdsGetPropertyData(EdsBaseRef    inRef,
 #                                             EdsPropertyID inPropertyID,
@@ -86,6 +103,20 @@ def _getPropertyData(
                            ctypes.byref(propertyData))
     return propertyData.value
 
+# Same as _getPropertyData, for properties which are not a single integer
+# (arrays or structures). The size expected by the SDK may differ from one
+# version to another, the buffer is then allocated large enough for both.
+def _getPropertyStruct(
+    ref: _BaseRef, propertyID: _PropertyID, additionalParam: int, dataType):
+    _, size = _getPropertySize(ref, propertyID, additionalParam)
+    buffer  = ctypes.create_string_buffer(max(size, ctypes.sizeof(dataType)))
+    lib.EdsGetPropertyData(ref,
+                           ctypes.c_uint32(int(propertyID)),
+                           ctypes.c_int32(additionalParam),
+                           size,
+                           buffer)
+    return dataType.from_buffer(buffer)
+
 # Defining EdsError EDSAPI EdsSetPropertyData(EdsBaseRef     inRef,
 #                                             EdsPropertyID  inPropertyID,
 #                                             EdsInt32       inParam,
@@ -196,7 +227,7 @@ def _createFlashSettingRef(cameraRef: _CameraRef) -> _FlashRef:
 
 
 # -------- Directory-item operating functions --------
-# Number of functions binded: 3 / 9
+# Number of functions binded: 4 / 9
 
 # Defining EdsError EDSAPI EdsGetDirectoryItemInfo(EdsDirectoryItemRef   inDirItemRef,
 #                                                  EdsDirectoryItemInfo* outDirItemInfo)
@@ -207,6 +238,12 @@ def _getDirectoryItemInfo(directoryItemRef: _DirectoryItemRef) -> _DirectoryItem
     lib.EdsGetDirectoryItemInfo(directoryItemRef, ctypes.byref(directoryItemInfo))
     return directoryItemInfo
 
+# Defining EdsError EDSAPI EdsDeleteDirectoryItem(EdsDirectoryItemRef inDirItemRef)
+lib.EdsDeleteDirectoryItem.restype  =  _error_restype
+lib.EdsDeleteDirectoryItem.argtypes = [_DirectoryItemRef]
+def _deleteDirectoryItem(directoryItemRef: _DirectoryItemRef) -> None:
+    lib.EdsDeleteDirectoryItem(directoryItemRef)
+
 # Defining EdsError EDSAPI EdsDownload(EdsDirectoryItemRef inDirItemRef,
 #                                      EdsUInt64           inReadSize,
 #                                      EdsStreamRef        outStream)
@@ -228,7 +265,7 @@ def _downloadComplete(directoryItemRef: _DirectoryItemRef) -> None:
     lib.EdsDownloadComplete(directoryItemRef)
 
 # -------- Stream operating functions --------
-# Number of functions binded: 4 / 12
+# Number of functions binded: 6 / 12
 
 # Defining EdsError EDSAPI EdsCreateFileStream(const EdsChar*           inFileName,
 #                                              EdsFileCreateDisposition inCreateDisposition,
@@ -272,6 +309,23 @@ def _getLength(streamRef: _StreamRef) -> int:
     lib.EdsGetLength(streamRef, length)
     return int(length.value)
 
+# Defining EdsError EDSAPI EdsGetPosition(EdsStreamRef inStreamRef,
+#                                         EdsUInt64*   outPosition)
+lib.EdsGetPosition.restype  =  _error_restype
+lib.EdsGetPosition.argtypes = [_StreamRef, ctypes.POINTER(ctypes.c_uint64)]
+def _getPosition(streamRef: _StreamRef) -> int:
+    position = ctypes.c_uint64()
+    lib.EdsGetPosition(streamRef, position)
+    return int(position.value)
+
+# Defining EdsError EDSAPI EdsSeek(EdsStreamRef  inStreamRef,
+#                                  EdsInt64      inSeekOffset,
+#                                  EdsSeekOrigin inSeekOrigin)
+lib.EdsSeek.restype  = _error_restype
+lib.EdsSeek.argtypes = [_StreamRef, ctypes.c_int64, ctypes.c_uint32]
+def _seek(streamRef: _StreamRef, offset: int, origin: _SeekOrigin) -> None:
+    lib.EdsSeek(streamRef, ctypes.c_int64(offset), ctypes.c_uint32(int(origin)))
+
 
 # -------- Image operating functions --------
 # Number of functions binded: 2 / 5
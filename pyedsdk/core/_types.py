@@ -32,6 +32,24 @@ class _Rational(ctypes.Structure):
         ("denominator", ctypes.c_uint32)
     ]
 
+class _Point(ctypes.Structure):
+    _fields_ = [
+        ("x", ctypes.c_int32),
+        ("y", ctypes.c_int32)
+    ]
+
+class _Size(ctypes.Structure):
+    _fields_ = [
+        ("width" , ctypes.c_int32),
+        ("height", ctypes.c_int32)
+    ]
+
+class _Rect(ctypes.Structure):
+    _fields_ = [
+        ("point", _Point),
+        ("size" , _Size)
+    ]
+
 class _DeviceInfo(ctypes.Structure):
     _fields_ = [
         ("szPortName"         , ctypes.c_char * 256),
@@ -78,6 +96,27 @@ class _PropertyDesc(ctypes.Structure):
     def values(self) -> list:
         return [self.propDesc[i] for i in range(self.numElements)]
 
+class _FocusPoint(ctypes.Structure):
+    _fields_ = [
+        ("valid"    , ctypes.c_uint32),
+        ("selected" , ctypes.c_uint32),
+        ("justFocus", ctypes.c_uint32),
+        ("rect"     , _Rect),
+        ("reserved" , ctypes.c_uint32)
+    ]
+
+class _FocusInfo(ctypes.Structure):
+    _fields_ = [
+        ("imageRect"  , _Rect),
+        ("pointNumber", ctypes.c_uint32),
+        ("focusPoint" , _FocusPoint * 1053),
+        ("executeMode", ctypes.c_uint32)
+    ]
+
+    @property
+    def points(self) -> list:
+        return [self.focusPoint[i] for i in range(min(self.pointNumber, len(self.focusPoint)))]
+
 class _Capacity(ctypes.Structure):
     _fields_ = [
         ("numberOfFreeClusters", ctypes.c_int32),
@@ -174,6 +213,12 @@ class _ObjectEvent(IntEnum):
     # EdsDownload to continue
     _DirItemRequestTransfer = 0x00000208
 
+# Stream seek origin
+class _SeekOrigin(IntEnum):
+    _Cur   = 0
+    _Begin = 1
+    _End   = 2
+
 # File create disposition
 class _FileCreateDisposition(IntEnum):
     _CreateNew        = 0
@@ -190,8 +235,9 @@ class _PropertyID(IntEnum):
     _SaveTo = 0x0000000b
 
     # --------- Image properties --------
-    # Number of properties binded: 1 / 11
+    # Number of properties binded: 2 / 11
     _ImageQuality = 0x00000100
+    _FocusInfo    = 0x00000104
 
     # ------- Capture properties --------
     # Number of properties binded: 7 / 38
@@ -204,9 +250,16 @@ class _PropertyID(IntEnum):
     _FlashMode   = 0x00000414
 
     # --------- EVF properties ----------
-    # Number of properties binded: 2 / 22
-    _Evf_OutputDevice = 0x00000500
-    _Evf_Mode         = 0x00000501
+    # Number of properties binded: 9 / 22
+    _Evf_OutputDevice     = 0x00000500
+    _Evf_Mode             = 0x00000501
+    _Evf_Zoom             = 0x00000507
+    _Evf_ZoomPosition     = 0x00000508
+    _Evf_Histogram        = 0x0000050A
+    _Evf_ImagePosition    = 0x0000050B
+    _Evf_HistogramStatus  = 0x0000050C
+    _Evf_CoordinateSystem = 0x00000540
+    _Evf_ZoomRect         = 0x00000541
 
     # -------- Limited properties -------
     # Number of properties binded: 3 / 39
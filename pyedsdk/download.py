@@ -0,0 +1,354 @@
+import ctypes, inspect, os, queue, threading, time
+
+from functools import partial
+
+from .core._functions import _download, _downloadComplete, _downloadCancel
+from .core._functions import _createFileStream, _createMemoryStream, _getPointer, _getPosition, _seek
+from .core._functions import _release
+
+from .core._types     import _DirectoryItemRef, _DirectoryItemInfo
+from .core._types     import _Access, _FileCreateDisposition, _SeekOrigin
+
+
+# Download targets are called from the object event handler with each item
+# the camera requests to transfer, and return what is handed to the user.
+# When a timeline is given, they mark in it the end of the transfer itself,
+# before the download is completed (and the file closed). Hash objects, when
+# given, are updated with the data as it is downloaded.
+def _markDownloaded(timeline: dict):
+    if timeline is not None:
+        timeline["downloaded"] = time.monotonic()
+
+
+class _FileDownload:
+    # With itemExtension, the extension of the filename is replaced by the
+    # one of the item on the camera (e.g. CR3 and JPG of a RAW+JPEG shot).
+    # Files are written by the SDK file stream, or by the given HostFileWriter.
+    def __init__(self, filename: str, itemExtension: bool = False, writer=None):
+        self._filename      = filename
+        self._itemExtension = itemExtension
+        self._writer        = writer
+
+    def filename(self, itemInfo: _DirectoryItemInfo) -> str:
+        if not self._itemExtension:
+            return self._filename
+
+        extension = os.path.splitext(itemInfo.szFileName.decode(errors="replace"))[1]
+        if not extension:
+            return self._filename
+        return os.path.splitext(self._filename)[0] + extension
+
+    def __call__(self, ref: _DirectoryItemRef, itemInfo: _DirectoryItemInfo, timeline: dict = None,
+                 hashers: dict = None) -> str:
+        filename = self.filename(itemInfo)
+        if self._writer is not None:
+            return self._writer.write(ref, itemInfo, filename, timeline, hashers)
+
+        # Data does not go through Python with the SDK file stream
+        if hashers:
+            raise ValueError("Digests require a HostFileWriter")
+
+        stream = _createFileStream(
+            filename,
+            _FileCreateDisposition._CreateAlways,
+            _Access._Write
+        )
+
+        try:
+            _download(ref, itemInfo.size, stream)
+            _markDownloaded(timeline)
+            _downloadComplete(ref)
+
+        finally:
+            _release(stream)
+
+        return filename
+
+
+class _MemoryDownload:
+    # The SDK memory stream is kept from one download to the next: once it
+    # has grown to the size of an image, next shots do not allocate anymore.
+    # The returned view points inside this stream, and is therefore only
+    # valid until the next download.
+    def __init__(self):
+        self._stream = None
+        self._view   = None
+
+    def __call__(self, ref: _DirectoryItemRef, itemInfo: _DirectoryItemInfo, timeline: dict = None,
+                 hashers: dict = None) -> memoryview:
+        if self._stream is None:
+            self._stream = _createMemoryStream(itemInfo.size)
+
+        # Previous image is overwritten
+        self._invalidate()
+        _seek(self._stream, 0, _SeekOrigin._Begin)
+
+        _download(ref, itemInfo.size, self._stream)
+        _markDownloaded(timeline)
+        _downloadComplete(ref)
+
+        # Pointer is read afterwards, as the buffer may have been reallocated
+        pointer    = _getPointer(self._stream)
+        buffer     = (ctypes.c_ubyte * itemInfo.size).from_address(pointer.value)
+        self._view = memoryview(buffer).cast("B").toreadonly()
+
+        for hasher in (hashers or {}).values():
+            hasher.update(self._view)
+
+        return self._view
+
+    def _invalidate(self):
+        if self._view is not None:
+            try:
+                self._view.release()
+            except BufferError:
+                pass # Still exported, it is up to the user not to use it
+            self._view = None
+
+    def release(self):
+        self._invalidate()
+        if self._stream is not None:
+            _release(self._stream)
+            self._stream = None
+
+
+class _MemoryDownloadPool:
+    # Memory downloads of the captures in flight: each capture gets its own
+    # set (one per item of a RAW+JPEG capture), given back once the capture
+    # completed. Sets are handed out in the order they were given back, and
+    # there is one more than captures in flight: the result of a capture is
+    # not overwritten by the next one, and remains valid until then.
+    def __init__(self, captures: int, itemsPerCapture: int = 2):
+        self._sets = [[_MemoryDownload() for _ in range(itemsPerCapture)] for _ in range(captures + 1)]
+        self._free = queue.Queue()
+        for downloads in self._sets:
+            self._free.put(downloads)
+
+    def acquire(self, timeout: float = None) -> list:
+        try:
+            return self._free.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No memory download freed after {timeout} seconds") from None
+
+    def giveBack(self, downloads: list):
+        self._free.put(downloads)
+
+    def release(self):
+        for downloads in self._sets:
+            for download in downloads:
+                download.release()
+
+
+def _sinkWriter(sink):
+    # Sockets, file objects, hash objects, generators and plain callables
+    if hasattr(sink, "sendall"):
+        return sink.sendall
+    if hasattr(sink, "write"):
+        return sink.write
+    if hasattr(sink, "update"):
+        return sink.update
+
+    if inspect.isgenerator(sink):
+        if inspect.getgeneratorstate(sink) == inspect.GEN_CREATED:
+            next(sink)
+        return sink.send
+
+    if callable(sink):
+        return sink
+
+    raise TypeError(f"Unsupported download sink: {type(sink).__name__}")
+
+
+class _SinkDownload:
+    # Pushes the item to a Python sink in fixed-size chunks, as they arrive.
+    # Two SDK memory streams are used alternately: the sink consumes a chunk
+    # on a writer thread while the next one is transferred from the camera.
+    # Chunks are views over these streams, sinks keeping them must copy them.
+    # The download fails unless the sink received the whole item.
+    # Streams may be given, to be reused from one download to the next: they
+    # are then left to the caller to release.
+    def __init__(self, sink, chunkSize: int = 1024 * 1024, streams: list = None):
+        # The SDK requires the chunks to be a multiple of 512 bytes
+        if chunkSize <= 0 or chunkSize % 512:
+            raise ValueError("Chunk size must be a positive multiple of 512 bytes")
+
+        self._sink      = sink
+        self._write     = _sinkWriter(sink)
+        self._chunkSize = chunkSize
+        self._streams   = streams
+
+    def __call__(self, ref: _DirectoryItemRef, itemInfo: _DirectoryItemInfo, timeline: dict = None,
+                 hashers: dict = None):
+        streams = self._streams or [_createMemoryStream(self._chunkSize) for _ in range(2)]
+
+        free   = queue.Queue()
+        chunks = queue.Queue()
+        for stream in streams:
+            free.put(stream)
+
+        # Errors of the writer thread, and bytes it handed to the sink
+        errors  = []
+        written = [0]
+        writer  = threading.Thread(target=self._writeChunks, args=(chunks, free, errors, written, hashers),
+                                   daemon=True)
+        writer.start()
+
+        completed = False
+        try:
+            remaining = itemInfo.size
+            while remaining > 0 and not errors:
+                size   = min(self._chunkSize, remaining)
+                stream = free.get()
+
+                _seek(stream, 0, _SeekOrigin._Begin)
+                _download(ref, size, stream)
+
+                # Only the bytes actually transferred are handed to the sink
+                chunks.put((stream, _getPosition(stream)))
+                remaining -= size
+
+            completed = True
+
+        finally:
+            # Writer is always waited for, as it reads from the streams
+            chunks.put(None)
+            writer.join()
+
+            if self._streams is None:
+                for stream in streams:
+                    _release(stream)
+
+            if not completed or errors or written[0] != itemInfo.size:
+                _downloadCancel(ref)
+
+        if errors:
+            raise errors[0]
+        if written[0] != itemInfo.size:
+            raise IOError(f"{written[0]} bytes received, {itemInfo.size} expected")
+
+        _markDownloaded(timeline)
+        _downloadComplete(ref)
+        return self._sink
+
+    def _writeChunks(self, chunks, free, errors, written, hashers):
+        while (chunk := chunks.get()) is not None:
+            stream, size = chunk
+            try:
+                if not errors:
+                    pointer = _getPointer(stream)
+                    buffer  = (ctypes.c_ubyte * size).from_address(pointer.value)
+                    view    = memoryview(buffer).cast("B").toreadonly()
+
+                    for hasher in (hashers or {}).values():
+                        hasher.update(view)
+                    self._write(view)
+                    written[0] += size
+            except Exception as error:
+                errors.append(error)
+            finally:
+                free.put(stream)
+
+
+class HostFileWriter:
+    # Writes downloaded items to files with plain OS calls, instead of the
+    # SDK file stream:
+    #  - files are preallocated to the size of the item, so that the file
+    #    system does not extend them write after write
+    #  - data is written in large blocks (chunkSize, a multiple of 512),
+    #    straight from the SDK memory streams, reused from a file to the next
+    #  - durability is set by the fsync policy: "never" (left to the OS),
+    #    "file" (each file is synced before being closed) or "batch" (files
+    #    are synced every batchSize files, and by sync())
+    _fsyncPolicies = ("never", "file", "batch")
+
+    def __init__(self, chunkSize: int = 4 * 1024 * 1024, fsync: str = "never", batchSize: int = 16,
+                 preallocate: bool = True):
+        if chunkSize <= 0 or chunkSize % 512:
+            raise ValueError("Chunk size must be a positive multiple of 512 bytes")
+        if fsync not in self._fsyncPolicies:
+            raise ValueError(f"Unknown fsync policy '{fsync}' (available: {self._fsyncPolicies})")
+
+        self.chunkSize   = chunkSize
+        self.fsync       = fsync
+        self.batchSize   = batchSize
+        self.preallocate = preallocate
+
+        # Downloads of a writer are serialized, as they share the streams
+        self._lock     = threading.Lock()
+        self._streams  = None
+        self._unsynced = []
+
+    def write(self, ref: _DirectoryItemRef, itemInfo: _DirectoryItemInfo, filename: str,
+              timeline: dict = None, hashers: dict = None) -> str:
+        with self._lock:
+            if self._streams is None:
+                self._streams = [_createMemoryStream(self.chunkSize) for _ in range(2)]
+
+            fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0))
+            try:
+                if self.preallocate:
+                    _preallocate(fd, itemInfo.size)
+
+                _SinkDownload(partial(_writeAll, fd), self.chunkSize, self._streams)(ref, itemInfo, timeline, hashers)
+
+                if self.fsync == "file":
+                    os.fsync(fd)
+
+            except BaseException:
+                os.close(fd)
+                os.remove(filename) # Partial file
+                raise
+
+            os.close(fd)
+
+            if self.fsync == "batch":
+                self._unsynced.append(filename)
+                if len(self._unsynced) >= self.batchSize:
+                    self._sync()
+
+        return filename
+
+    def sync(self):
+        with self._lock:
+            self._sync()
+
+    def _sync(self):
+        for filename in self._unsynced:
+            fd = os.open(filename, os.O_RDWR | getattr(os, "O_BINARY", 0))
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        self._unsynced.clear()
+
+    def close(self):
+        with self._lock:
+            self._sync()
+            if self._streams is not None:
+                for stream in self._streams:
+                    _release(stream)
+                self._streams = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exceptionType, exceptionValue, traceback):
+        self.close()
+
+
+def _preallocate(fd: int, size: int):
+    if hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(fd, 0, size)
+            return
+        except OSError:
+            pass # Not supported by every file system (e.g. some network shares)
+
+    # Extending the file allocates it on Windows, and makes it sparse elsewhere
+    os.ftruncate(fd, size)
+
+def _writeAll(fd: int, data: memoryview):
+    # os.write may write less than asked
+    while data:
+        written = os.write(fd, data)
+        data    = data[written:]
@@ -0,0 +1,97 @@
+import asyncio
+
+from concurrent.futures import ThreadPoolExecutor
+
+from .live_view_frame import LiveViewFrame
+
+
+class _AsyncFrameSource:
+    # Bridges a LiveViewStream to asyncio. Blocking SDK downloads are run on
+    # a single dedicated executor thread, and frames are handed over to the
+    # event loop through a bounded asyncio queue: when every awaiting
+    # coroutine lags behind, the producer stops downloading (backpressure).
+    # Awaiting coroutines share the queue: each frame goes to one of them
+    # only, unlike subscribe() which hands every frame to every consumer.
+    def __init__(self, stream, maxSize: int = 2):
+        self._stream  = stream
+        self._maxSize = maxSize
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pyedsdk-evf")
+
+        # Created lazily, in the event loop awaiting the frames
+        self._loop  = None
+        self._queue = None
+        self._task  = None
+        self._error = None
+
+
+    def _ensureStarted(self):
+        if self._task is not None:
+            return
+
+        self._loop  = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(self._maxSize)
+        self._task  = self._loop.create_task(self._produce())
+
+    async def _produce(self):
+        try:
+            while self._stream._running:
+                # Executor future itself is kept: the asyncio one is already
+                # cancelled when the download completes
+                future = self._executor.submit(self._stream._acquireFrame)
+                try:
+                    frame = await asyncio.wrap_future(future)
+                except asyncio.CancelledError:
+                    # Frame downloaded after the cancellation must still be released
+                    future.add_done_callback(_releaseFrameOf)
+                    raise
+
+                try:
+                    await self._queue.put(frame)
+                except asyncio.CancelledError:
+                    frame.release()
+                    raise
+
+        except asyncio.CancelledError:
+            # Stream stopped: frames nobody will await anymore are released
+            while not self._queue.empty():
+                self._queue.get_nowait().release()
+        except Exception as error:
+            # Stream stopped in the meantime, this is not an error
+            if self._stream._running:
+                self._error = error
+        finally:
+            # Sentinel waking up every awaiting coroutine
+            while self._queue.full():
+                self._queue.get_nowait().release()
+            self._queue.put_nowait(None)
+
+
+    async def next(self) -> LiveViewFrame:
+        self._ensureStarted()
+
+        frame = await self._queue.get()
+        if frame is None:
+            # Sentinel is put back for the other awaiting coroutines
+            self._queue.put_nowait(None)
+            if self._error is not None:
+                raise self._error
+            raise StopAsyncIteration
+
+        return frame
+
+    def close(self):
+        # May be called from any thread, including the event loop one
+        if self._task is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._task.cancel)
+            except RuntimeError:
+                pass # Event loop already closed
+
+        # Waits for the download in progress, if any
+        self._executor.shutdown(wait=True)
+
+
+def _releaseFrameOf(future):
+    if not future.cancelled() and future.exception() is None:
+        future.result().release()
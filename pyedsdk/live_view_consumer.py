@@ -0,0 +1,136 @@
+import threading
+
+from collections import deque
+
+from .live_view_frame import LiveViewFrame
+
+
+class LiveViewConsumer:
+    # Drop policies, applied when a new frame arrives on a full consumer:
+    #  - "dropOldest": the oldest pending frame is dropped (latest frame wins)
+    #  - "dropNewest": the incoming frame is dropped
+    #  - "block"     : the producer waits until the consumer catches up
+    _dropPolicies = ("dropOldest", "dropNewest", "block")
+
+    def __init__(self, maxSize: int = 1, policy: str = "dropOldest"):
+        if maxSize < 1:
+            raise ValueError("Consumer queue size must be at least 1")
+        if policy not in self._dropPolicies:
+            raise ValueError(f"Unknown drop policy '{policy}' (available: {self._dropPolicies})")
+
+        self._maxSize = maxSize
+        self._policy  = policy
+
+        self._frames    = deque()
+        self._condition = threading.Condition()
+
+        self._closed = False
+        self._error  = None
+
+        # Statistics
+        self._delivered = 0
+        self._dropped   = 0
+
+
+    @property
+    def policy(self) -> str:
+        return self._policy
+
+    @property
+    def delivered(self) -> int:
+        return self._delivered
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "delivered": self._delivered,
+                "dropped"  : self._dropped,
+                "pending"  : len(self._frames),
+            }
+
+
+    # --------- Producer side ---------
+    # The consumer takes ownership of the reference held on the frame
+    def _push(self, frame: LiveViewFrame) -> None:
+        with self._condition:
+            if self._closed:
+                frame.release()
+                return
+
+            if len(self._frames) >= self._maxSize:
+                if self._policy == "dropOldest":
+                    self._frames.popleft().release()
+                    self._dropped += 1
+
+                elif self._policy == "dropNewest":
+                    frame.release()
+                    self._dropped += 1
+                    return
+
+                else:
+                    self._condition.wait_for(lambda: len(self._frames) < self._maxSize or self._closed)
+                    if self._closed:
+                        frame.release()
+                        return
+
+            self._frames.append(frame)
+            self._condition.notify_all()
+
+    def close(self, error: Exception = None, drain: bool = False) -> None:
+        # When drained, pending frames can still be consumed after closing
+        with self._condition:
+            if self._closed:
+                return
+
+            self._closed = True
+            self._error  = error
+
+            while self._frames and not drain:
+                self._frames.popleft().release()
+
+            self._condition.notify_all()
+
+
+    # --------- Consumer side ---------
+    def get(self, timeout: float = None) -> LiveViewFrame:
+        # Returned frame must be released once consumed
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._frames or self._closed, timeout):
+                raise TimeoutError(f"No live view frame received after {timeout} seconds")
+
+            if not self._frames:
+                if self._error is not None:
+                    raise self._error
+                raise RuntimeError("Live view consumer closed")
+
+            frame = self._frames.popleft()
+            self._delivered += 1
+            self._condition.notify_all()
+
+            return frame
+
+    def _take(self):
+        # Yields frames until the consumer is closed, ownership of each
+        # frame is transferred to the caller
+        while True:
+            try:
+                frame = self.get()
+            except RuntimeError:
+                if self._error is not None:
+                    raise
+                return
+
+            yield frame
+
+    def __iter__(self):
+        for frame in self._take():
+            with frame:
+                yield frame
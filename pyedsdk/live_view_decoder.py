@@ -0,0 +1,157 @@
+import io, struct
+
+from collections        import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools          import partial
+
+
+# Available reduced scales, natively supported by JPEG (DCT scaling)
+_scales = (1, 2, 4, 8)
+
+# Image information returned by the pure Python fallback decoder
+JpegHeader = namedtuple("JpegHeader", ["width", "height", "components"])
+
+
+# --------- Decoding backends ---------
+# Every backend is a module level function so it can be sent to a process pool
+def _decodeOpenCV(data, scale: int, grayscale: bool):
+    import cv2, numpy as np
+
+    if grayscale:
+        flags = {1: cv2.IMREAD_GRAYSCALE,           2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+                 4: cv2.IMREAD_REDUCED_GRAYSCALE_4, 8: cv2.IMREAD_REDUCED_GRAYSCALE_8}
+    else:
+        flags = {1: cv2.IMREAD_COLOR,           2: cv2.IMREAD_REDUCED_COLOR_2,
+                 4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), flags[scale])
+
+def _decodePillow(data, scale: int, grayscale: bool):
+    import numpy as np
+    from PIL import Image
+
+    mode  = "L" if grayscale else "RGB"
+    image = Image.open(io.BytesIO(data))
+
+    # Draft mode lets the JPEG decoder itself skip the unneeded resolution
+    if scale > 1:
+        image.draft(mode, (image.width // scale, image.height // scale))
+
+    return np.asarray(image.convert(mode))
+
+def _decodeHeader(data, scale: int, grayscale: bool) -> JpegHeader:
+    # Pure Python fallback: only reads the frame header (SOF segment) to
+    # get the size of the image as it would be decoded at the given scale
+    data   = memoryview(data)
+    offset = 2
+    while offset + 4 <= len(data):
+        marker, length = struct.unpack_from(">HH", data, offset)
+
+        # SOF0 to SOF15 markers, except DHT (C4), JPG (C8) and DAC (CC)
+        if 0xFFC0 <= marker <= 0xFFCF and marker not in (0xFFC4, 0xFFC8, 0xFFCC):
+            height, width, components = struct.unpack_from(">HHB", data, offset + 5)
+            return JpegHeader(-(-width // scale), -(-height // scale), 1 if grayscale else components)
+
+        offset += 2 + length
+
+    raise ValueError("Invalid JPEG data: no frame header found")
+
+def _decode(backend: str, scale: int, grayscale: bool, transform, data):
+    image = _backends[backend](data, scale, grayscale)
+    return image if transform is None else transform(image)
+
+_backends = {
+    "opencv": _decodeOpenCV,
+    "pillow": _decodePillow,
+    "header": _decodeHeader,
+}
+
+def _defaultBackend() -> str:
+    try:
+        import cv2
+        return "opencv"
+    except ImportError:
+        pass
+
+    try:
+        import PIL, numpy
+        return "pillow"
+    except ImportError:
+        return "header"
+
+
+class FrameDecoder:
+    # Decodes live view JPEG frames on a pool of threads or processes, while
+    # keeping the order of the frames. OpenCV and Pillow release the GIL
+    # while decoding, so that a thread pool is usually enough. An optional
+    # transform is applied to the decoded image by the worker itself (it
+    # must be picklable with a process pool).
+    def __init__(self, workers: int = 2, executor: str = "thread", scale: int = 1,
+                 backend: str = "auto", grayscale: bool = False, maxPending: int = None,
+                 transform=None):
+        if scale not in _scales:
+            raise ValueError(f"Unsupported decoding scale {scale} (available: {_scales})")
+
+        if backend == "auto":
+            backend = _defaultBackend()
+        if backend not in _backends:
+            raise ValueError(f"Unknown decoding backend '{backend}' (available: {tuple(_backends)})")
+
+        if executor == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pyedsdk-decode")
+        elif executor == "process":
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            raise ValueError(f"Unknown executor '{executor}' (available: ('thread', 'process'))")
+
+        self._inProcess  = executor == "process"
+        self._decode     = partial(_decode, backend, scale, grayscale, transform)
+        self._maxPending = maxPending or 2 * workers
+
+        self.backend = backend
+        self.scale   = scale
+
+
+    @property
+    def maxPending(self) -> int:
+        return self._maxPending
+
+    def _submit(self, frame):
+        # Threads can decode directly from the frame buffer, whereas
+        # processes need a copy of the data to be pickled
+        data = frame.tobytes() if self._inProcess else frame.data
+        return self._executor.submit(self._decode, data)
+
+    def map(self, frames):
+        # Yields each frame, in order, with its decoded image attached. The
+        # frames are not released, this is up to the caller.
+        pending = deque()
+        try:
+            for frame in frames:
+                pending.append((frame, self._submit(frame)))
+
+                if len(pending) >= self._maxPending:
+                    frame, future = pending.popleft()
+                    frame.image   = future.result()
+                    yield frame
+
+            while pending:
+                frame, future = pending.popleft()
+                frame.image   = future.result()
+                yield frame
+
+        finally:
+            # Frames never yielded are released here, once no worker uses them
+            for frame, future in pending:
+                if not future.cancel():
+                    future.exception()
+                frame.release()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exceptionType, exceptionValue, traceback):
+        self.close()
@@ -0,0 +1,98 @@
+from collections import namedtuple
+from functools   import partial
+
+from .live_view_decoder import FrameDecoder, _defaultBackend
+
+
+FocusScore = namedtuple("FocusScore", ["sequence", "timestamp", "score"])
+
+
+# --------- Sharpness metrics ---------
+# Both metrics work on a 2D luma plane, and are fully vectorized with NumPy
+def laplacianVariance(luma) -> float:
+    # Variance of the 4-neighbour Laplacian
+    luma = luma.astype("float32", copy=False)
+    laplacian = (luma[1:-1, :-2] + luma[1:-1, 2:] + luma[:-2, 1:-1] + luma[2:, 1:-1]
+                 - 4 * luma[1:-1, 1:-1])
+    return float(laplacian.var())
+
+def tenengrad(luma, threshold: float = 0.) -> float:
+    # Mean squared magnitude of the Sobel gradient, above the threshold
+    luma = luma.astype("float32", copy=False)
+
+    left   = luma[:-2, :-2] + 2 * luma[1:-1, :-2] + luma[2:, :-2]
+    right  = luma[:-2,  2:] + 2 * luma[1:-1,  2:] + luma[2:,  2:]
+    top    = luma[:-2, :-2] + 2 * luma[:-2, 1:-1] + luma[:-2, 2:]
+    bottom = luma[ 2:, :-2] + 2 * luma[ 2:, 1:-1] + luma[ 2:, 2:]
+
+    magnitude = (right - left) ** 2 + (bottom - top) ** 2
+    if threshold > 0:
+        magnitude = magnitude[magnitude > threshold ** 2]
+
+    return float(magnitude.mean()) if magnitude.size else 0.
+
+_metrics = {
+    "laplacian": laplacianVariance,
+    "tenengrad": tenengrad,
+}
+
+
+def _luma(image):
+    # Color images (BGR from OpenCV or RGB from Pillow) are reduced to luma,
+    # the weights of both green and red/blue channels being kept symmetric
+    if image.ndim == 2:
+        return image
+    return image[..., 1] * 0.587 + (image[..., 0] + image[..., 2]) * 0.2065
+
+def _score(metric: str, roi, scale: int, image) -> float:
+    luma = _luma(image)
+
+    # Region of interest (x, y, width, height) is given in full resolution
+    if roi is not None:
+        x, y, width, height = (value // scale for value in roi)
+        luma = luma[y:y + height, x:x + width]
+
+    return _metrics[metric](luma)
+
+
+class FocusScorer:
+    # Computes a focus score for every live view frame, on the decoding
+    # workers: frames are decoded in grayscale and at reduced scale, so that
+    # only the luma plane is ever reconstructed.
+    def __init__(self, metric: str = "laplacian", roi: tuple = None, scale: int = 4, **decoderOptions):
+        if metric not in _metrics:
+            raise ValueError(f"Unknown focus metric '{metric}' (available: {tuple(_metrics)})")
+
+        # Header backend only reads the size of the images, not their pixels
+        backend = decoderOptions.pop("backend", "auto")
+        if backend == "header":
+            raise ValueError("Focus scores need decoded images: 'header' backend can not be used")
+        if backend == "auto":
+            backend = _defaultBackend()
+            if backend == "header":
+                raise ImportError("Focus scores need OpenCV, or Pillow and NumPy, to decode the images")
+
+        self.metric = metric
+        self.roi    = roi
+
+        self._decoder = FrameDecoder(scale=scale, grayscale=True, backend=backend,
+                                     transform=partial(_score, metric, roi, scale), **decoderOptions)
+
+    @property
+    def decoder(self) -> FrameDecoder:
+        return self._decoder
+
+    def scores(self, frames):
+        # Frames are consumed and released, only their scores are yielded
+        for frame in self._decoder.map(frames):
+            with frame:
+                yield FocusScore(frame.sequence, frame.timestamp, frame.image)
+
+    def close(self):
+        self._decoder.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exceptionType, exceptionValue, traceback):
+        self.close()
@@ -0,0 +1,90 @@
+import threading
+
+
+class LiveViewFrame:
+    # A live view frame exposes the JPEG data through a read-only memoryview.
+    # Depending on how it has been acquired, this view may point directly
+    # inside the EDSDK memory stream, so that no copy is ever made. Frames
+    # are leased: they must be released once consumed (or used as a context
+    # manager) so the underlying buffer can be reused by the next download.
+    # Data must never be accessed once the frame has been released.
+    def __init__(self, data: memoryview, sequence: int = 0, timestamp: float = 0., onRelease=None):
+        self._data      = data
+        self._onRelease = onRelease
+
+        self._lock     = threading.Lock()
+        self._refCount = 1
+
+        self.sequence  = sequence
+        self.timestamp = timestamp
+
+        # Same image as the previous frame (live view polled too fast)
+        self.isDuplicate = False
+
+        # EVF properties (histogram, zoom, focus...), if requested
+        self.metadata = None
+
+        # Decoded image, filled in by a FrameDecoder
+        self.image = None
+
+
+    @property
+    def data(self) -> memoryview:
+        if self._data is None:
+            raise RuntimeError("Live view frame already released")
+        return self._data
+
+    @property
+    def released(self) -> bool:
+        return self._data is None
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def tobytes(self) -> bytes:
+        return self.data.tobytes()
+
+
+    # --------- Lease management ---------
+    def _retain(self):
+        with self._lock:
+            if self._data is None:
+                raise RuntimeError("Live view frame already released")
+            self._refCount += 1
+
+        return self
+
+    def release(self):
+        with self._lock:
+            if self._data is None:
+                return
+
+            self._refCount -= 1
+            if self._refCount > 0:
+                return
+
+            data, self._data = self._data, None
+
+        # Views exported to NumPy (or any other buffer consumer) prevent the
+        # memoryview from being released. In that case it is up to the user
+        # not to keep them alive past the release of the frame.
+        try:
+            data.release()
+        except BufferError:
+            pass
+
+        if self._onRelease is not None:
+            self._onRelease(self)
+
+    def _invalidate(self):
+        # Forces the release when the underlying buffer is about to be freed
+        with self._lock:
+            self._refCount = 1
+
+        self.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exceptionType, exceptionValue, traceback):
+        self.release()
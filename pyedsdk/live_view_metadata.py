@@ -0,0 +1,87 @@
+import ctypes
+
+from collections import namedtuple
+
+from .core._errors    import CanonError
+from .core._functions import _getPropertyData, _getPropertyStruct
+from .core._types     import _EvfImageRef, _PropertyID, _Point, _Size, _Rect, _FocusInfo
+
+
+FocusPoint = namedtuple("FocusPoint", ["rect", "selected", "justFocus"])
+
+
+class EvfMetadata:
+    # Live view properties of a frame, as computed by the camera. Positions
+    # are (x, y) tuples, sizes (width, height) and rectangles (x, y, w, h),
+    # expressed in the coordinate system of the camera sensor.
+    #  - histogram is a (4, 256) array of Y, R, G and B channels
+    #  - focusPoints only lists the valid AF points
+    def __init__(self):
+        self.histogram        = None
+        self.histogramStatus  = None
+        self.zoom             = None
+        self.zoomPosition     = None
+        self.zoomRect         = None
+        self.imagePosition    = None
+        self.coordinateSystem = None
+        self.focusPoints      = None
+
+    def __repr__(self) -> str:
+        return (f"EvfMetadata(zoom={self.zoom}, zoomRect={self.zoomRect}, "
+                f"imagePosition={self.imagePosition}, focusPoints={self.focusPoints})")
+
+
+def _point(point: _Point) -> tuple:
+    return (point.x, point.y)
+
+def _rect(rect: _Rect) -> tuple:
+    return (rect.point.x, rect.point.y, rect.size.width, rect.size.height)
+
+def _histogram(histogram):
+    # Histogram buffer is wrapped as it is, without conversion to a list
+    try:
+        import numpy as np
+        return np.frombuffer(histogram, dtype=np.uint32).reshape(4, 256)
+    except ImportError:
+        return memoryview(histogram).cast("B").cast("I", (4, 256))
+
+def _optional(read):
+    # Not every camera supports every live view property
+    try:
+        return read()
+    except CanonError:
+        return None
+
+
+def _readEvfMetadata(evfImageRef: _EvfImageRef) -> EvfMetadata:
+    metadata = EvfMetadata()
+
+    histogram = _optional(lambda: _getPropertyStruct(evfImageRef, _PropertyID._Evf_Histogram, 0, ctypes.c_uint32 * 1024))
+    if histogram is not None:
+        metadata.histogram = _histogram(histogram)
+
+    metadata.histogramStatus = _optional(lambda: _getPropertyData(evfImageRef, _PropertyID._Evf_HistogramStatus, 0))
+    metadata.zoom            = _optional(lambda: _getPropertyData(evfImageRef, _PropertyID._Evf_Zoom, 0))
+
+    zoomPosition = _optional(lambda: _getPropertyStruct(evfImageRef, _PropertyID._Evf_ZoomPosition, 0, _Point))
+    if zoomPosition is not None:
+        metadata.zoomPosition = _point(zoomPosition)
+
+    zoomRect = _optional(lambda: _getPropertyStruct(evfImageRef, _PropertyID._Evf_ZoomRect, 0, _Rect))
+    if zoomRect is not None:
+        metadata.zoomRect = _rect(zoomRect)
+
+    imagePosition = _optional(lambda: _getPropertyStruct(evfImageRef, _PropertyID._Evf_ImagePosition, 0, _Point))
+    if imagePosition is not None:
+        metadata.imagePosition = _point(imagePosition)
+
+    coordinateSystem = _optional(lambda: _getPropertyStruct(evfImageRef, _PropertyID._Evf_CoordinateSystem, 0, _Size))
+    if coordinateSystem is not None:
+        metadata.coordinateSystem = (coordinateSystem.width, coordinateSystem.height)
+
+    focusInfo = _optional(lambda: _getPropertyStruct(evfImageRef, _PropertyID._FocusInfo, 0, _FocusInfo))
+    if focusInfo is not None:
+        metadata.focusPoints = [FocusPoint(_rect(point.rect), bool(point.selected), bool(point.justFocus))
+                                for point in focusInfo.points if point.valid]
+
+    return metadata
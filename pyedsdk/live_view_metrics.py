@@ -0,0 +1,91 @@
+import threading, time
+
+from array import array
+
+
+class _RollingWindow:
+    # Fixed-size ring of the last values, backed by a flat array of doubles
+    def __init__(self, size: int):
+        self._values = array("d", bytes(8 * size))
+        self._size   = size
+        self._index  = 0
+        self._count  = 0
+
+    def add(self, value: float) -> None:
+        self._values[self._index] = value
+        self._index = (self._index + 1) % self._size
+        self._count = min(self._count + 1, self._size)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def summary(self, percentiles=(50, 90, 99)) -> dict | None:
+        if not self._count:
+            return None
+
+        values = sorted(self._values[:self._count])
+        summary = {"mean": sum(values) / self._count, "max": values[-1]}
+        for percentile in percentiles:
+            # Nearest-rank percentile
+            rank = max(0, -(-percentile * self._count // 100) - 1)
+            summary[f"p{percentile}"] = values[rank]
+
+        return summary
+
+
+class LiveViewMetrics:
+    # Per-frame live view measurements, over a rolling window of frames:
+    #  - downloadTime: time spent in EdsDownloadEvfImage (seconds)
+    #  - retries     : number of ERR_OBJECT_NOTREADY before the frame
+    #  - frameSize   : JPEG size (bytes)
+    #  - interval    : time elapsed since the previous frame (seconds)
+    #  - callbackTime: time spent in the user callback (seconds)
+    _windows = ("downloadTime", "retries", "frameSize", "interval", "callbackTime")
+
+    def __init__(self, windowSize: int = 512):
+        self._lock    = threading.Lock()
+        self._windows = {name: _RollingWindow(windowSize) for name in self._windows}
+
+        self._frameCount = 0
+        self._lastFrame  = None
+
+        # Optional periodic reporter, called from the acquisition thread
+        self._reporter     = None
+        self._reportPeriod = 1.
+        self._lastReport   = time.monotonic()
+
+
+    def setReporter(self, reporter, period: float = 1.) -> None:
+        self._reporter     = reporter
+        self._reportPeriod = period
+        self._lastReport   = time.monotonic()
+
+    def recordFrame(self, downloadTime: float, retries: int, frameSize: int, timestamp: float) -> None:
+        with self._lock:
+            self._windows["downloadTime"].add(downloadTime)
+            self._windows["retries"     ].add(retries)
+            self._windows["frameSize"   ].add(frameSize)
+
+            if self._lastFrame is not None:
+                self._windows["interval"].add(timestamp - self._lastFrame)
+
+            self._lastFrame   = timestamp
+            self._frameCount += 1
+
+        if self._reporter is not None and timestamp - self._lastReport >= self._reportPeriod:
+            self._lastReport = timestamp
+            self._reporter(self.stats())
+
+    def recordCallback(self, callbackTime: float) -> None:
+        with self._lock:
+            self._windows["callbackTime"].add(callbackTime)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {name: window.summary() for name, window in self._windows.items()}
+            stats["frames"] = self._frameCount
+
+        interval     = stats["interval"]
+        stats["fps"] = 1 / interval["mean"] if interval and interval["mean"] > 0 else 0.
+
+        return stats
@@ -0,0 +1,72 @@
+import time
+
+
+class FramePacer:
+    # The camera refreshes its live view buffer at a fixed rate (usually
+    # around 30 fps), and asking for a new frame before it is ready only
+    # results in ERR_OBJECT_NOTREADY. The pacer learns this refresh interval
+    # and schedules the next download right before the next frame is due,
+    # polling with an exponential backoff when it arrives too early.
+    def __init__(self, targetFps: float = None, initialInterval: float = 1 / 30,
+                 minBackoff: float = 0.001, smoothing: float = 0.2, lead: float = 0.85):
+        if targetFps is not None and targetFps <= 0:
+            raise ValueError("Target FPS must be strictly positive")
+
+        self._minInterval = 1 / targetFps if targetFps else 0.
+        self._interval    = initialInterval
+        self._minBackoff  = minBackoff
+        self._smoothing   = smoothing
+        self._lead        = lead
+
+        # Estimated time at which the last frame became available, and if
+        # this estimation is accurate (i.e. it has been waited for)
+        self._lastReady    = None
+        self._lastAccurate = False
+
+
+    @property
+    def interval(self) -> float:
+        return self._interval
+
+    @property
+    def targetFps(self) -> float | None:
+        return 1 / self._minInterval if self._minInterval else None
+
+    @targetFps.setter
+    def targetFps(self, targetFps: float | None):
+        self._minInterval = 1 / targetFps if targetFps else 0.
+
+
+    # Sleeps until the next frame is expected to be ready
+    def wait(self) -> None:
+        if self._lastReady is None:
+            return
+
+        nextFrame = self._lastReady + max(self._interval * self._lead, self._minInterval)
+        delay     = nextFrame - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    # Sleeps after the attempt-th consecutive ERR_OBJECT_NOTREADY
+    def backoff(self, attempt: int) -> None:
+        maxBackoff = max(self._minBackoff, self._interval / 8)
+        time.sleep(min(self._minBackoff * 2 ** (attempt - 1), maxBackoff))
+
+    def frameReceived(self, retries: int) -> None:
+        now = time.monotonic()
+
+        # A frame obtained after some retries has just become available:
+        # the time elapsed since the previous one is a refresh interval
+        # sample, as long as the previous timestamp was accurate as well
+        accurate = retries > 0
+        if accurate and self._lastAccurate:
+            sample = now - self._lastReady
+            self._interval += self._smoothing * (sample - self._interval)
+
+        # Without any retry, the frame may have been ready for a while: the
+        # interval is probably overestimated and is slowly shortened
+        elif not accurate:
+            self._interval = max(self._minBackoff, self._interval * (1 - self._smoothing / 4))
+
+        self._lastReady    = now
+        self._lastAccurate = accurate
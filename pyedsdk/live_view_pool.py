@@ -0,0 +1,118 @@
+import threading
+
+from collections import deque
+
+from .live_view_frame import LiveViewFrame
+
+
+class FramePool:
+    # Overflow policies, applied when every slot of the pool is leased:
+    #  - "allocate": a temporary buffer is allocated (counted as a miss)
+    #  - "block"   : waits until a slot is released
+    #  - "raise"   : raises a RuntimeError
+    _overflowPolicies = ("allocate", "block", "raise")
+
+    def __init__(self, capacity: int = 8, slotSize: int = 512 * 1024, overflow: str = "allocate"):
+        if capacity < 1:
+            raise ValueError("Frame pool capacity must be at least 1")
+        if overflow not in self._overflowPolicies:
+            raise ValueError(f"Unknown overflow policy '{overflow}' (available: {self._overflowPolicies})")
+
+        self._capacity = capacity
+        self._slotSize = slotSize
+        self._overflow = overflow
+
+        # All buffers are allocated once and for all
+        self._slots = [bytearray(slotSize) for _ in range(capacity)]
+        self._free  = deque(range(capacity))
+
+        self._condition = threading.Condition()
+        self._wakeups   = 0
+
+        # Statistics
+        self._hits      = 0
+        self._misses    = 0
+        self._grown     = 0
+        self._inUse     = 0
+        self._highWater = 0
+
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def overflow(self) -> str:
+        return self._overflow
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "capacity" : self._capacity,
+                "slotSize" : self._slotSize,
+                "hits"     : self._hits,
+                "misses"   : self._misses,
+                "grown"    : self._grown,
+                "inUse"    : self._inUse,
+                "highWater": self._highWater,
+            }
+
+
+    # --------- Slot management ---------
+    def _acquireSlot(self, size: int, timeout: float = None):
+        with self._condition:
+            if not self._free:
+                if self._overflow == "raise":
+                    raise RuntimeError(f"Frame pool exhausted ({self._capacity} frames in use)")
+
+                if self._overflow == "allocate":
+                    self._misses += 1
+                    return None, bytearray(size)
+
+                wakeups = self._wakeups
+                if not self._condition.wait_for(lambda: self._free or self._wakeups != wakeups, timeout):
+                    raise TimeoutError(f"No frame pool slot released after {timeout} seconds")
+                if not self._free:
+                    raise RuntimeError("Wait for a frame pool slot interrupted")
+
+            index = self._free.popleft()
+
+            # A frame larger than the slot makes it grow for good: next
+            # frames of the same size will then fit in without allocation
+            if len(self._slots[index]) < size:
+                self._slots[index] = bytearray(max(size, 2 * len(self._slots[index])))
+                self._grown += 1
+            else:
+                self._hits += 1
+
+            self._inUse    += 1
+            self._highWater = max(self._highWater, self._inUse)
+
+            return index, self._slots[index]
+
+    def _releaseSlot(self, index):
+        if index is None:
+            return
+
+        with self._condition:
+            self._free.append(index)
+            self._inUse -= 1
+            self._condition.notify()
+
+
+    def wake(self):
+        # Threads waiting for a slot give up (e.g. their stream is stopped)
+        with self._condition:
+            self._wakeups += 1
+            self._condition.notify_all()
+
+    def frameFrom(self, source: memoryview, sequence: int = 0, timestamp: float = 0., timeout: float = None) -> LiveViewFrame:
+        size = len(source)
+        index, slot = self._acquireSlot(size, timeout)
+
+        # Single memmove from the source buffer into the preallocated slot
+        view = memoryview(slot)[:size]
+        view[:] = source
+
+        return LiveViewFrame(view.toreadonly(), sequence, timestamp,
+                             onRelease=lambda frame: self._releaseSlot(index))
@@ -0,0 +1,181 @@
+import bisect, mmap, struct, threading, time
+
+from .live_view_consumer import LiveViewConsumer
+
+
+# Frames are written as they come, one JPEG after another, which makes the
+# recording itself a raw MJPEG stream readable by most video tools. A
+# separate index file stores one fixed-size record per frame, so that any
+# frame can be found without scanning the recording.
+_indexHeader = struct.Struct("<8sd")   # Magic, wall clock time of first frame
+_indexRecord = struct.Struct("<QIId")  # Offset, length, sequence, timestamp
+
+_indexMagic = b"PYEDSIDX"
+
+
+def _indexPath(path: str) -> str:
+    return path + ".idx"
+
+
+class LiveViewRecorder:
+    # Writes the frames received from a live view consumer on a background
+    # thread, with large buffered writes. Frames are never re-encoded.
+    def __init__(self, path: str, bufferSize: int = 4 * 1024 * 1024):
+        self._path       = path
+        self._bufferSize = bufferSize
+
+        self._stream   = None
+        self._consumer = None
+        self._thread   = None
+        self._error    = None
+
+        self._frameCount = 0
+        self._byteCount  = 0
+
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def frameCount(self) -> int:
+        return self._frameCount
+
+    @property
+    def byteCount(self) -> int:
+        return self._byteCount
+
+    def stats(self) -> dict:
+        stats = {"frames": self._frameCount, "bytes": self._byteCount}
+        if self._consumer is not None:
+            stats["dropped"] = self._consumer.dropped
+        return stats
+
+
+    def start(self, stream, maxSize: int = 256, policy: str = "block"):
+        if self._thread is not None:
+            raise RuntimeError("Recorder already started")
+
+        self._stream   = stream
+        self._consumer = stream.subscribe(maxSize=maxSize, policy=policy)
+
+        self._thread = threading.Thread(target=self._write, args=(self._consumer,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+
+        # Pending frames are still written before the recording is closed
+        self._stream.unsubscribe(self._consumer, drain=True)
+        self._thread.join()
+        self._thread = None
+
+        if self._error is not None:
+            raise self._error
+
+    def _write(self, consumer: LiveViewConsumer):
+        try:
+            with open(self._path, "wb", buffering=self._bufferSize) as data, \
+                 open(_indexPath(self._path), "wb", buffering=self._bufferSize) as index:
+
+                start = None
+                for frame in consumer:
+                    if start is None:
+                        start = frame.timestamp
+                        index.write(_indexHeader.pack(_indexMagic, time.time()))
+
+                    size = len(frame)
+                    index.write(_indexRecord.pack(self._byteCount, size, frame.sequence, frame.timestamp - start))
+                    data.write(frame.data)
+
+                    self._frameCount += 1
+                    self._byteCount  += size
+
+        except Exception as error:
+            self._error = error
+            self._stream.unsubscribe(consumer)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exceptionType, exceptionValue, traceback):
+        self.stop()
+
+
+class LiveViewRecording:
+    # Random access to a recording: both files are memory mapped, a frame is
+    # found in O(1) from its index and in O(log n) from its timestamp, and
+    # returned as a memoryview over the recording, without any copy.
+    def __init__(self, path: str):
+        with open(path, "rb") as data, open(_indexPath(path), "rb") as index:
+            self._data  = mmap.mmap(data.fileno(),  0, access=mmap.ACCESS_READ) if data.seek(0, 2)  else b""
+            self._index = mmap.mmap(index.fileno(), 0, access=mmap.ACCESS_READ) if index.seek(0, 2) else b""
+
+        self.startTime = 0.
+        if len(self._index):
+            magic, self.startTime = _indexHeader.unpack_from(self._index, 0)
+            if magic != _indexMagic:
+                raise ValueError(f"Invalid live view recording index: {_indexPath(path)}")
+
+        # Index may be truncated if the recording has been interrupted
+        self._frameCount = max(0, len(self._index) - _indexHeader.size) // _indexRecord.size
+
+        # Timestamps only, kept as a lazy sequence for the bisection
+        self._timestamps = _TimestampView(self)
+
+
+    def __len__(self) -> int:
+        return self._frameCount
+
+    def _record(self, index: int) -> tuple:
+        if index < 0:
+            index += self._frameCount
+        if not 0 <= index < self._frameCount:
+            raise IndexError(f"Frame index {index} out of range (available frames: {self._frameCount})")
+
+        return _indexRecord.unpack_from(self._index, _indexHeader.size + index * _indexRecord.size)
+
+    def frame(self, index: int) -> memoryview:
+        offset, length, _, _ = self._record(index)
+        return memoryview(self._data)[offset:offset + length]
+
+    def sequence(self, index: int) -> int:
+        return self._record(index)[2]
+
+    def timestamp(self, index: int) -> float:
+        # Seconds elapsed since the first frame of the recording
+        return self._record(index)[3]
+
+    def indexAt(self, timestamp: float) -> int:
+        # Index of the last frame displayed at the given time
+        return max(0, bisect.bisect_right(self._timestamps, timestamp) - 1)
+
+    def frameAt(self, timestamp: float) -> memoryview:
+        return self.frame(self.indexAt(timestamp))
+
+    def __iter__(self):
+        for index in range(self._frameCount):
+            yield self.frame(index)
+
+    def close(self):
+        for mapped in (self._data, self._index):
+            if isinstance(mapped, mmap.mmap):
+                mapped.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exceptionType, exceptionValue, traceback):
+        self.close()
+
+
+class _TimestampView:
+    def __init__(self, recording: LiveViewRecording):
+        self._recording = recording
+
+    def __len__(self) -> int:
+        return len(self._recording)
+
+    def __getitem__(self, index: int) -> float:
+        return self._recording.timestamp(index)
@@ -0,0 +1,167 @@
+import asyncio, threading
+
+
+class _Client:
+    def __init__(self, address, queueSize: int):
+        self.address = address
+        self.task    = asyncio.current_task()
+        self.queue   = asyncio.Queue(queueSize)
+        self.sent    = 0
+        self.dropped = 0
+
+    def push(self, payload: bytes):
+        # A slow client drops its oldest frames, it never stalls the others
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(payload)
+
+
+class LiveViewServer:
+    # Serves a single live view stream to any number of HTTP clients, as a
+    # multipart/x-mixed-replace MJPEG stream (directly viewable in browsers).
+    # Frames are pulled once from the camera, and the same bytes are sent to
+    # every client.
+    _boundary = b"pyedsdkframe"
+
+    def __init__(self, stream, host: str = "127.0.0.1", port: int = 8080, clientQueueSize: int = 1):
+        self._stream          = stream
+        self._host            = host
+        self._port            = port
+        self._clientQueueSize = clientQueueSize
+
+        self._clients = set()
+        self._loop    = None
+        self._server  = None
+
+        self._consumer = None
+        self._reader   = None
+        self._thread   = None # Only used when the server runs its own loop
+        self._started  = threading.Event()
+        self._error    = None
+
+
+    @property
+    def address(self) -> tuple:
+        if self._server is None:
+            return (self._host, self._port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    @property
+    def clientCount(self) -> int:
+        return len(self._clients)
+
+    def clientStats(self) -> list:
+        return [{"address": client.address, "sent": client.sent, "dropped": client.dropped}
+                for client in list(self._clients)]
+
+
+    # --------- Server within an existing asyncio event loop ---------
+    async def serve(self):
+        self._loop   = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._handleClient, self._host, self._port)
+
+        # Frames are read on a thread, as waiting for them is blocking
+        self._consumer = self._stream.subscribe(maxSize=1, policy="dropOldest")
+        self._reader   = threading.Thread(target=self._readFrames, args=(self._consumer,), daemon=True)
+        self._reader.start()
+
+        self._started.set()
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            self._stream.unsubscribe(self._consumer)
+            self._reader.join()
+
+    def _readFrames(self, consumer):
+        for frame in consumer:
+            payload = frame.tobytes()
+            try:
+                self._loop.call_soon_threadsafe(self._broadcast, payload)
+            except RuntimeError:
+                return # Event loop closed
+
+    def _shutdown(self):
+        # Connected clients would otherwise keep the server from closing
+        self._server.close()
+        for client in list(self._clients):
+            client.task.cancel()
+
+    def _broadcast(self, payload: bytes):
+        for client in self._clients:
+            client.push(payload)
+
+    async def _handleClient(self, reader, writer):
+        client = _Client(writer.get_extra_info("peername"), self._clientQueueSize)
+        try:
+            # Request itself is ignored: every path serves the stream
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+
+            writer.write(b"HTTP/1.1 200 OK\r\n"
+                         b"Content-Type: multipart/x-mixed-replace; boundary=" + self._boundary + b"\r\n"
+                         b"Cache-Control: no-cache, private\r\n"
+                         b"Connection: close\r\n\r\n")
+
+            self._clients.add(client)
+            while True:
+                payload = await client.queue.get()
+                writer.write(b"--" + self._boundary + b"\r\n"
+                             b"Content-Type: image/jpeg\r\n"
+                             b"Content-Length: %d\r\n\r\n" % len(payload))
+                writer.write(payload)
+                writer.write(b"\r\n")
+                await writer.drain()
+                client.sent += 1
+
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass # Client disconnected
+        except asyncio.CancelledError:
+            pass # Server shut down
+        finally:
+            self._clients.discard(client)
+            writer.close()
+
+
+    # --------- Server running on its own thread ---------
+    def start(self):
+        if self._thread is not None:
+            return
+
+        self._thread = threading.Thread(target=asyncio.run, args=(self._runUntilStopped(),), daemon=True)
+        self._thread.start()
+        self._started.wait()
+
+        if self._error is not None:
+            self._thread.join()
+            self._thread = None
+            raise self._error
+
+    async def _runUntilStopped(self):
+        try:
+            await self.serve()
+        except asyncio.CancelledError:
+            pass
+        except Exception as error:
+            self._error = error
+        finally:
+            self._started.set()
+
+    def stop(self):
+        if self._server is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._shutdown)
+            except RuntimeError:
+                pass # Event loop already closed
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exceptionType, exceptionValue, traceback):
+        self.stop()
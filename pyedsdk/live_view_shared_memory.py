@@ -0,0 +1,213 @@
+import struct, threading, time
+
+from multiprocessing import resource_tracker, shared_memory
+
+
+# Layout of the shared memory segment:
+#  - a header describing the ring, and the sequence of the latest frame
+#  - slotCount slots, each one made of a small header followed by the data
+# A slot is protected by two copies of the sequence of the frame it holds
+# (seqlock): the first one is updated before writing the data, the second
+# one after. A reader compares them to detect a frame being overwritten.
+_ringHeader = struct.Struct("<8sIIQ")  # Magic, slot count, slot size, latest sequence
+_slotHeader = struct.Struct("<QIdQ")   # Write sequence, length, timestamp, commit sequence
+
+_ringMagic        = b"PYEDSSHM"
+_ringHeaderSize   = 64
+_latestOffset     = 16
+_slotCommitOffset = 20
+
+
+class _SharedRing:
+    def __init__(self, memory: shared_memory.SharedMemory, slotCount: int, slotSize: int):
+        self._memory    = memory
+        self._buffer    = memory.buf
+        self._slotCount = slotCount
+        self._slotSize  = slotSize
+
+    @property
+    def name(self) -> str:
+        return self._memory.name
+
+    def _slotOffset(self, sequence: int) -> int:
+        return _ringHeaderSize + (sequence % self._slotCount) * (_slotHeader.size + self._slotSize)
+
+    def _latest(self) -> int:
+        return struct.unpack_from("<Q", self._buffer, _latestOffset)[0]
+
+
+class SharedFramePublisher(_SharedRing):
+    # Writes live view frames into a shared memory ring that any number of
+    # SharedFrameReader, in other processes, can read from without copy
+    def __init__(self, name: str = None, slotCount: int = 8, slotSize: int = 1024 * 1024):
+        size   = _ringHeaderSize + slotCount * (_slotHeader.size + slotSize)
+        memory = shared_memory.SharedMemory(name=name, create=True, size=size)
+        super().__init__(memory, slotCount, slotSize)
+
+        _ringHeader.pack_into(self._buffer, 0, _ringMagic, slotCount, slotSize, 0)
+
+        self._sequence  = 0
+        self._oversized = 0
+
+        self._stream   = None
+        self._consumer = None
+        self._thread   = None
+
+
+    @property
+    def sequence(self) -> int:
+        return self._sequence
+
+    @property
+    def oversized(self) -> int:
+        # Frames skipped as they do not fit in a slot
+        return self._oversized
+
+    def write(self, data, timestamp: float = None) -> int:
+        size = len(data)
+        if size > self._slotSize:
+            self._oversized += 1
+            return 0
+
+        self._sequence += 1
+        sequence = self._sequence
+        offset   = self._slotOffset(sequence)
+        start    = offset + _slotHeader.size
+
+        _slotHeader.pack_into(self._buffer, offset, sequence, size,
+                              time.monotonic() if timestamp is None else timestamp, 0)
+        self._buffer[start:start + size] = data
+        struct.pack_into("<Q", self._buffer, offset + _slotCommitOffset, sequence)
+
+        struct.pack_into("<Q", self._buffer, _latestOffset, sequence)
+        return sequence
+
+
+    # --------- Publishing a live view stream ---------
+    def start(self, stream, maxSize: int = 1, policy: str = "dropOldest"):
+        if self._thread is not None:
+            raise RuntimeError("Publisher already started")
+
+        self._stream   = stream
+        self._consumer = stream.subscribe(maxSize=maxSize, policy=policy)
+
+        self._thread = threading.Thread(target=self._publish, args=(self._consumer,), daemon=True)
+        self._thread.start()
+
+    def _publish(self, consumer):
+        for frame in consumer:
+            self.write(frame.data, frame.timestamp)
+
+    def stop(self):
+        if self._thread is None:
+            return
+
+        self._stream.unsubscribe(self._consumer)
+        self._thread.join()
+        self._thread = None
+
+    def close(self):
+        # Publisher owns the shared memory segment, which is then destroyed
+        self.stop()
+        self._memory.close()
+        self._memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exceptionType, exceptionValue, traceback):
+        self.close()
+
+
+class SharedFrame:
+    # Frame read from the shared memory: data is a view over the ring slot,
+    # which remains valid until the publisher overwrites it
+    def __init__(self, reader, offset: int, sequence: int, timestamp: float, data: memoryview):
+        self._reader = reader
+        self._offset = offset
+
+        self.sequence  = sequence
+        self.timestamp = timestamp
+        self.data      = data
+
+    def valid(self) -> bool:
+        # To be checked after processing the data, to make sure it has not
+        # been overwritten in the meantime
+        return _slotHeader.unpack_from(self._reader._buffer, self._offset)[0] == self.sequence
+
+    def release(self):
+        self.data.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exceptionType, exceptionValue, traceback):
+        self.release()
+
+
+class SharedFrameReader(_SharedRing):
+    def __init__(self, name: str, pollInterval: float = 0.001):
+        memory = shared_memory.SharedMemory(name=name)
+
+        # The segment belongs to the publisher: it must not be destroyed by
+        # the resource tracker of this process when it exits
+        try:
+            resource_tracker.unregister(memory._name, "shared_memory")
+        except Exception:
+            pass
+
+        magic, slotCount, slotSize, _ = _ringHeader.unpack_from(memory.buf, 0)
+        if magic != _ringMagic:
+            memory.close()
+            raise ValueError(f"Shared memory '{name}' is not a live view frame ring")
+
+        super().__init__(memory, slotCount, slotSize)
+        self._pollInterval = pollInterval
+
+    @property
+    def latestSequence(self) -> int:
+        return self._latest()
+
+    def read(self, sequence: int) -> SharedFrame | None:
+        # Returns None if the frame is not (or no longer) in the ring
+        offset = self._slotOffset(sequence)
+        writeSequence, size, timestamp, commitSequence = _slotHeader.unpack_from(self._buffer, offset)
+        if writeSequence != sequence or commitSequence != sequence:
+            return None
+
+        start = offset + _slotHeader.size
+        return SharedFrame(self, offset, sequence, timestamp, self._buffer[start:start + size].toreadonly())
+
+    def latest(self) -> SharedFrame | None:
+        sequence = self._latest()
+        return self.read(sequence) if sequence else None
+
+    def wait(self, after: int = 0, timeout: float = None) -> SharedFrame:
+        # Waits for the first frame more recent than the given sequence
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self._latest() > after:
+                frame = self.latest()
+                if frame is not None:
+                    return frame
+
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"No new live view frame after {timeout} seconds")
+            time.sleep(self._pollInterval)
+
+    def frames(self):
+        # Always yields the latest frame, skipping the ones missed meanwhile
+        sequence = 0
+        while True:
+            with self.wait(sequence) as frame:
+                sequence = frame.sequence
+                yield frame
+
+    def close(self):
+        self._memory.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exceptionType, exceptionValue, traceback):
+        self.close()
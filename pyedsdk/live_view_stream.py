@@ -1,10 +1,39 @@
-import ctypes, threading
+import ctypes, threading, time, zlib
 
 from .core._errors    import CanonError, _ErrorCode
 from .core._functions import _createEvfImageRef, _createMemoryStream, _downloadEvfImage, _getPointer, _getLength, _release
 
+from .live_view_frame    import LiveViewFrame
+from .live_view_pool     import FramePool
+from .live_view_consumer import LiveViewConsumer
+from .live_view_pacing   import FramePacer
+from .live_view_async    import _AsyncFrameSource
+from .live_view_decoder  import FrameDecoder
+from .live_view_focus    import FocusScorer
+from .live_view_metadata import _readEvfMetadata
+from .live_view_metrics  import LiveViewMetrics
+from .live_view_recorder import LiveViewRecorder
+from .live_view_server   import LiveViewServer
+
+from .live_view_shared_memory import SharedFramePublisher
+
 class LiveViewStream:
-    def __init__(self, camera):
+    # Maximum time (in seconds) a new download waits for a leased frame
+    _leaseTimeout = 5.
+
+    # Maximum time (in seconds) waiting for the camera to provide a frame
+    _readyTimeout = 5.
+
+    # Size of the regions hashed to detect duplicated frames
+    _duplicateSampleSize = 4096
+    _duplicateModes      = (None, "flag", "skip")
+
+    def __init__(self, camera, framePool: FramePool = None, decoupled: bool = False, dropPolicy: str = "dropOldest",
+                 targetFps: float = None, asyncQueueSize: int = 2, duplicates: str = "flag",
+                 metadata: bool = False):
+        if duplicates not in self._duplicateModes:
+            raise ValueError(f"Unknown duplicates mode '{duplicates}' (available: {self._duplicateModes})")
+
         self._camera = camera
         self._running = False
 
@@ -13,6 +42,49 @@ class LiveViewStream:
 
         self._thread = None # Callback mode
 
+        # Consumer feeding the callback in decoupled mode, kept for its stats
+        self._callbackConsumer = None
+
+        # Producer/consumer mode: a producer thread keeps downloading frames
+        # which are dispatched to every subscribed consumer
+        self._producer      = None
+        self._consumers     = []
+        self._consumersLock = threading.Lock()
+        self._downloadLock  = threading.RLock()
+
+        # In decoupled callback mode, the callback is run on its own thread
+        self._decoupled  = decoupled
+        self._dropPolicy = dropPolicy
+
+        # Schedules downloads according to the camera refresh rate
+        self._pacer = FramePacer(targetFps)
+
+        # asyncio mode, created on the first awaited frame
+        self._asyncSource    = None
+        self._asyncQueueSize = asyncQueueSize
+
+        # Frame leased directly over the SDK memory stream (zero-copy)
+        self._leasedFrame = None
+        self._leaseFree   = threading.Event()
+        self._leaseFree.set()
+
+        self._sequence = 0
+
+        # Optional preallocated buffers frames are copied into
+        self._framePool = framePool
+
+        # The same image can be downloaded twice when polling faster than
+        # the camera refreshes it: such frames are flagged or skipped
+        self._duplicates     = duplicates
+        self._fingerprint    = None
+        self._duplicateCount = 0
+
+        # Optional EVF properties read along with each frame
+        self._metadata = metadata
+
+        # Performance measurements of every frame
+        self._metrics = LiveViewMetrics()
+
 
     def start(self, callback=None, errorCallback=None):
         if self._running:
@@ -27,7 +99,14 @@ class LiveViewStream:
 
         self._running = True
 
-        if callback is not None:
+        if callback is not None and self._decoupled:
+            # Callback only receives the latest frames, while acquisition goes on at full rate
+            consumer = self.subscribe(maxSize=1, policy=self._dropPolicy)
+            self._callbackConsumer = consumer
+            self._thread = threading.Thread(target=self._consumerLoop, args=(consumer, callback, errorCallback), daemon=True)
+            self._thread.start()
+
+        elif callback is not None:
             # If a callback is already provided, we will start a new thread to call it on every new frame:
             self._thread = threading.Thread(target=self._loop, args=(callback, errorCallback), daemon=True)
             self._thread.start()
@@ -39,6 +118,25 @@ class LiveViewStream:
 
         self._running = False
 
+        # Unblock consumers and producer
+        with self._consumersLock:
+            consumers, self._consumers = self._consumers, []
+        for consumer in consumers:
+            consumer.close()
+
+        # Producer may be waiting for a slot of a blocking pool
+        if self._framePool is not None:
+            self._framePool.wake()
+
+        if self._producer is not None:
+            self._producer.join()
+            self._producer = None
+
+        # Cancel asyncio producer, and wait for its current download
+        if self._asyncSource is not None:
+            self._asyncSource.close()
+            self._asyncSource = None
+
         # Deactivate callback loop
         if self._thread is not None:
             self._thread.join()
@@ -47,6 +145,10 @@ class LiveViewStream:
         # Deactivate live view on camera
         self._camera._endLiveView()
 
+        # A frame still leased would point to freed memory
+        if self._leasedFrame is not None:
+            self._leasedFrame._invalidate()
+
         # Free all buffer and ressources
         if self._evfImg is not None:
             _release(self._evfImg)
@@ -57,31 +159,238 @@ class LiveViewStream:
             self._stream = None
 
 
-    def getFrame(self) -> bytes:
+    # --------- Internal functions for frame acquisition ---------
+    # Returned frame is a view over the SDK memory stream, which is only
+    # valid until the next download: callers must hold the download lock
+    def _downloadFrame(self) -> LiveViewFrame:
         if not self._running:
             raise RuntimeError("Live view not started")
 
-        # Retry loop (safe)
-        for _ in range(750):
+        # The SDK memory stream is overwritten on every download: the
+        # previous frame must have been released by its consumer first
+        if not self._leaseFree.wait(self._leaseTimeout):
+            raise RuntimeError("Previous live view frame is still leased")
+
+        view, duplicate, retries, downloadTime = self._downloadEvf()
+        self._sequence += 1
+
+        frame = LiveViewFrame(view, self._sequence, time.monotonic())
+        frame.isDuplicate = duplicate
+
+        self._metrics.recordFrame(downloadTime, retries, len(view), frame.timestamp)
+
+        # EVF image reference is also overwritten by the next download
+        if self._metadata:
+            frame.metadata = _readEvfMetadata(self._evfImg)
+
+        return frame
+
+    def _downloadEvf(self):
+        self._pacer.wait()
+
+        # Retry loop (safe), paced until the camera provides the frame
+        deadline     = time.monotonic() + self._readyTimeout
+        retries      = 0
+        downloadTime = 0.
+        while True:
             try:
-                _downloadEvfImage(self._camera._cameraRef, self._evfImg)
-                break
+                start = time.perf_counter()
+                try:
+                    _downloadEvfImage(self._camera._cameraRef, self._evfImg)
+                finally:
+                    downloadTime += time.perf_counter() - start
+
+                view      = self._evfView()
+                duplicate = self._checkDuplicate(view)
+                if not (duplicate and self._duplicates == "skip"):
+                    break
+
+                # A skipped duplicate is handled as a not ready frame
+                view.release()
+
             except CanonError as err:
-                if err.code == _ErrorCode.ERR_OBJECT_NOTREADY:
-                    continue
-                raise
-        else:
-            # After some iterations, we will return a time-out
-            raise CanonError(_ErrorCode.ERR_WAIT_TIMEOUT_ERROR)
+                if err.code != _ErrorCode.ERR_OBJECT_NOTREADY:
+                    raise
+
+            # After some time, we will return a time-out
+            if time.monotonic() > deadline:
+                raise CanonError(_ErrorCode.ERR_WAIT_TIMEOUT_ERROR)
+
+            retries += 1
+            self._pacer.backoff(retries)
+
+        self._pacer.frameReceived(retries)
 
+        return view, duplicate, retries, downloadTime
+
+    def _evfView(self) -> memoryview:
         ptr  = _getPointer(self._stream)
         size = _getLength (self._stream)
 
-        return ctypes.string_at(ptr.value, size)
+        # Read-only view over the SDK buffer, without any copy
+        buffer = (ctypes.c_ubyte * size).from_address(ptr.value)
+        return memoryview(buffer).cast("B").toreadonly()
+
+    def _checkDuplicate(self, view: memoryview) -> bool:
+        if self._duplicates is None:
+            return False
+
+        # Length and hashes of two sampled regions of the entropy coded
+        # data, the JPEG headers being identical from one frame to another
+        size        = len(view)
+        middle      = size // 2
+        fingerprint = (size, zlib.crc32(view[middle:middle + self._duplicateSampleSize]),
+                             zlib.crc32(view[-self._duplicateSampleSize:]))
+
+        duplicate, self._fingerprint = fingerprint == self._fingerprint, fingerprint
+        if duplicate:
+            self._duplicateCount += 1
+
+        return duplicate
+
+    def _releaseLease(self, frame):
+        self._leasedFrame = None
+        self._leaseFree.set()
+
+    def _acquireFrame(self) -> LiveViewFrame:
+        # Frame owning its data, independent from the SDK memory stream
+        with self._downloadLock:
+            with self._downloadFrame() as source:
+                if self._framePool is not None:
+                    # Bounded wait, as the download lock is held meanwhile
+                    frame = self._framePool.frameFrom(source.data, source.sequence, source.timestamp,
+                                                      self._leaseTimeout)
+                else:
+                    frame = LiveViewFrame(memoryview(source.tobytes()), source.sequence, source.timestamp)
+
+                frame.isDuplicate = source.isDuplicate
+                frame.metadata    = source.metadata
+                return frame
+
+    def _startProducer(self):
+        if self._producer is not None:
+            return
+
+        self._producer = threading.Thread(target=self._produce, daemon=True)
+        self._producer.start()
+
+    def _produce(self):
+        try:
+            while self._running:
+                frame = self._acquireFrame()
+
+                with self._consumersLock:
+                    consumers = list(self._consumers)
+
+                # Each consumer holds its own reference on the frame
+                for consumer in consumers:
+                    consumer._push(frame._retain())
+                frame.release()
+
+        except Exception as error:
+            if not self._running:
+                return # Interrupted by stop()
+
+            self._running = False
+            print("LiveViewStream producer error:", error)
+
+            with self._consumersLock:
+                consumers, self._consumers = self._consumers, []
+            for consumer in consumers:
+                consumer.close(error)
+
+
+    # --------- End users functions ---------
+    def subscribe(self, maxSize: int = 1, policy: str = "dropOldest") -> LiveViewConsumer:
+        if not self._running:
+            raise RuntimeError("Live view not started")
+
+        consumer = LiveViewConsumer(maxSize, policy)
+        with self._consumersLock:
+            self._consumers.append(consumer)
+
+        self._startProducer()
+        return consumer
+
+    def unsubscribe(self, consumer: LiveViewConsumer, drain: bool = False) -> None:
+        with self._consumersLock:
+            if consumer in self._consumers:
+                self._consumers.remove(consumer)
+
+        consumer.close(drain=drain)
+
+    def record(self, path: str, maxSize: int = 256, policy: str = "block", **recorderOptions) -> LiveViewRecorder:
+        # Frames are archived as they are, until recorder.stop() is called
+        recorder = LiveViewRecorder(path, **recorderOptions)
+        recorder.start(self, maxSize=maxSize, policy=policy)
+        return recorder
+
+    @property
+    def targetFps(self) -> float | None:
+        return self._pacer.targetFps
+
+    @targetFps.setter
+    def targetFps(self, targetFps: float | None):
+        self._pacer.targetFps = targetFps
+
+    @property
+    def frameInterval(self) -> float:
+        # Estimated refresh interval of the camera live view
+        return self._pacer.interval
+
+    @property
+    def callbackStats(self) -> dict | None:
+        # Frames delivered to and dropped by the decoupled callback
+        if self._callbackConsumer is None:
+            return None
+        return self._callbackConsumer.stats()
+
+    @property
+    def poolStats(self) -> dict | None:
+        if self._framePool is None:
+            return None
+        return self._framePool.stats()
+
+    def stats(self) -> dict:
+        # Rolling percentiles of download time, retries, frame size, frame
+        # interval and callback time, along with the resulting frame rate
+        stats = self._metrics.stats()
+        stats["duplicates"] = self._duplicateCount
+        return stats
+
+    def setReporter(self, reporter, period: float = 1.) -> None:
+        # reporter(stats) is called periodically from the acquisition thread
+        self._metrics.setReporter(reporter, period)
+
+    @property
+    def duplicateCount(self) -> int:
+        return self._duplicateCount
+
+    def getFrame(self) -> bytes:
+        with self._downloadLock:
+            with self._downloadFrame() as frame:
+                return frame.tobytes()
+
+    def leaseFrame(self) -> LiveViewFrame:
+        # With a frame pool, the frame is copied into one of its slots, and
+        # several frames can then be leased at the same time
+        if self._framePool is not None:
+            return self._acquireFrame()
+
+        # Returned frame is a view over the SDK memory stream. It must be
+        # released before the next frame can be downloaded.
+        with self._downloadLock:
+            frame = self._downloadFrame()
+            frame._onRelease = self._releaseLease
+
+            self._leaseFree.clear()
+            self._leasedFrame = frame
+
+        return frame
 
 
     def __iter__(self):
-        if self._thread is not None:
+        if self._thread is not None or self._producer is not None:
             raise RuntimeError("Live view already running in callback mode")
 
         self.start()
@@ -91,14 +400,108 @@ class LiveViewStream:
         finally:
             self.stop()
 
+    def frames(self):
+        # Zero-copy counterpart of the iterator: each frame is released
+        # automatically when the next one is requested
+        if self._thread is not None or self._producer is not None:
+            raise RuntimeError("Live view already running in callback mode")
+
+        self.start()
+        try:
+            while self._running:
+                with self.leaseFrame() as frame:
+                    yield frame
+        finally:
+            self.stop()
+
+
+    def publish(self, name: str = None, **publisherOptions) -> SharedFramePublisher:
+        # Frames are written into a shared memory ring, until publisher.close()
+        publisher = SharedFramePublisher(name, **publisherOptions)
+        publisher.start(self)
+        return publisher
+
+    def serve(self, host: str = "127.0.0.1", port: int = 8080, **serverOptions) -> LiveViewServer:
+        # MJPEG HTTP server running on its own thread, until server.stop().
+        # Only local clients are served, unless another host is given.
+        server = LiveViewServer(self, host, port, **serverOptions)
+        server.start()
+        return server
+
+    def decodedFrames(self, decoder: FrameDecoder = None, **decoderOptions):
+        # Frames are decoded in parallel while acquisition goes on, and are
+        # yielded in order with their decoded image (frame.image)
+        decoder  = decoder or FrameDecoder(**decoderOptions)
+        consumer = self.subscribe(maxSize=decoder.maxPending, policy="dropOldest")
+        try:
+            for frame in decoder.map(consumer._take()):
+                with frame:
+                    yield frame
+        finally:
+            self.unsubscribe(consumer)
+            decoder.close()
+
+    def focusScores(self, scorer: FocusScorer = None, **scorerOptions):
+        # Only the focus scores of the frames are yielded, not the images
+        scorer   = scorer or FocusScorer(**scorerOptions)
+        consumer = self.subscribe(maxSize=scorer.decoder.maxPending, policy="dropOldest")
+        try:
+            yield from scorer.scores(consumer._take())
+        finally:
+            self.unsubscribe(consumer)
+            scorer.close()
+
+
+    # --------- asyncio functions ---------
+    async def nextFrame(self) -> LiveViewFrame:
+        # Returned frame must be released once consumed. Coroutines awaiting
+        # frames share them (each frame goes to one of them only): they must
+        # subscribe() to each get every frame.
+        if not self._running:
+            raise RuntimeError("Live view not started")
+
+        if self._asyncSource is None:
+            self._asyncSource = _AsyncFrameSource(self, self._asyncQueueSize)
+
+        return await self._asyncSource.next()
+
+    async def __aiter__(self):
+        # Unlike the synchronous iterator, the stream is not stopped at the
+        # end of the loop, as other coroutines may still await frames. The
+        # loop ends once the stream is stopped, including from its body.
+        self.start()
+        while self._running:
+            try:
+                frame = await self.nextFrame()
+            except StopAsyncIteration:
+                return
+
+            with frame:
+                yield frame
+
+
+    def _consumerLoop(self, consumer, callback, errorCallback=None):
+        try:
+            for frame in consumer:
+                start = time.perf_counter()
+                callback(frame)
+                self._metrics.recordCallback(time.perf_counter() - start)
+        except Exception as error:
+            self._running = False
+            print("LiveViewStream loop error:", error)
+            if errorCallback:
+                errorCallback(error)
 
     def _loop(self, callback, errorCallback=None):
         try:
             while self._running:
                 frame = self.getFrame()
+
+                start = time.perf_counter()
                 callback(frame)
+                self._metrics.recordCallback(time.perf_counter() - start)
         except Exception as error:
             self._running = False
             print("LiveViewStream loop error:", error)
             if errorCallback:
-                errorCallback(error)
\ No newline at end of file
+                errorCallback(error)
@@ -0,0 +1,192 @@
+import mmap, os, struct
+
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch            import fnmatch
+
+
+# Canon RAW files embed JPEG images, which are found without decoding RAW:
+#  - CR2 is a TIFF file: IFD0 holds the full-size preview (strip offset and
+#    byte count), IFD1 the thumbnail (JPEGInterchangeFormat and length)
+#  - CR3 is an ISO base media file: the Canon uuid box of moov holds the
+#    thumbnail (THMB box), and a top-level uuid box the preview (PRVW box)
+_cr3CanonUuid   = bytes.fromhex("85c0b687820f11e08111f4ce462b6a48")
+_cr3PreviewUuid = bytes.fromhex("eaf42b5e1c984b88b9fbb7dc406e4d16")
+
+_tiffStripOffsets    = 0x0111
+_tiffStripByteCounts = 0x0117
+_tiffJpegOffset      = 0x0201
+_tiffJpegLength      = 0x0202
+
+_rawPatterns = ("*.CR2", "*.CR3", "*.cr2", "*.cr3")
+
+
+def _jpegAt(buffer, offset: int, size: int) -> memoryview | None:
+    # Only a range actually starting with a JPEG SOI marker is returned
+    if offset <= 0 or size <= 0 or offset + size > len(buffer):
+        return None
+    if buffer[offset:offset + 2] != b"\xff\xd8":
+        return None
+    return buffer[offset:offset + size]
+
+
+# --------- CR2 (TIFF) ---------
+def _tiffEntries(buffer, order: str, offset: int) -> tuple:
+    # Entries of the IFD (tag -> inline value, for single SHORT and LONG
+    # values), and the offset of the next IFD
+    count,  = struct.unpack_from(order + "H", buffer, offset)
+    entries = {}
+    for entry in range(offset + 2, offset + 2 + 12 * count, 12):
+        tag, dataType, valueCount = struct.unpack_from(order + "HHI", buffer, entry)
+        if valueCount != 1:
+            continue
+        if dataType == 3:   # SHORT
+            entries[tag] = struct.unpack_from(order + "H", buffer, entry + 8)[0]
+        elif dataType == 4: # LONG
+            entries[tag] = struct.unpack_from(order + "I", buffer, entry + 8)[0]
+
+    nextOffset, = struct.unpack_from(order + "I", buffer, offset + 2 + 12 * count)
+    return entries, nextOffset
+
+def _parseCr2(buffer) -> dict:
+    order = {b"II": "<", b"MM": ">"}[bytes(buffer[:2])]
+    ifd0, = struct.unpack_from(order + "I", buffer, 4)
+
+    entries0, ifd1 = _tiffEntries(buffer, order, ifd0)
+    images = {"preview": _jpegAt(buffer, entries0.get(_tiffStripOffsets, 0),
+                                         entries0.get(_tiffStripByteCounts, 0))}
+
+    if ifd1:
+        entries1, _ = _tiffEntries(buffer, order, ifd1)
+        images["thumbnail"] = _jpegAt(buffer, entries1.get(_tiffJpegOffset, 0),
+                                              entries1.get(_tiffJpegLength, 0))
+
+    return images
+
+
+# --------- CR3 (ISO base media file format) ---------
+def _boxes(buffer, start: int, end: int):
+    # Yields (type, uuid, content start, box end) of the boxes in the range
+    while start + 8 <= end:
+        size, boxType = struct.unpack_from(">I4s", buffer, start)
+        header = 8
+        if size == 1:
+            size,   = struct.unpack_from(">Q", buffer, start + 8)
+            header  = 16
+        elif size == 0:
+            size = end - start
+
+        uuid = None
+        if boxType == b"uuid":
+            uuid    = bytes(buffer[start + header:start + header + 16])
+            header += 16
+
+        if size < header or start + size > end:
+            return # Truncated or corrupted box
+        yield boxType, uuid, start + header, start + size
+
+        start += size
+
+def _canonJpeg(buffer, start: int, end: int, sizeOffset: int) -> memoryview | None:
+    # THMB and PRVW boxes start with 16 bytes (version, dimensions, and the
+    # size of the JPEG, at offset 8 in THMB and 12 in PRVW) before the JPEG
+    size, = struct.unpack_from(">I", buffer, start + sizeOffset)
+    return _jpegAt(buffer, start + 16, min(size, end - start - 16))
+
+def _parseCr3(buffer) -> dict:
+    images = {"preview": None, "thumbnail": None}
+
+    for boxType, uuid, start, end in _boxes(buffer, 0, len(buffer)):
+        if boxType == b"moov":
+            for childType, childUuid, childStart, childEnd in _boxes(buffer, start, end):
+                if childUuid == _cr3CanonUuid:
+                    for canonType, _, canonStart, canonEnd in _boxes(buffer, childStart, childEnd):
+                        if canonType == b"THMB":
+                            images["thumbnail"] = _canonJpeg(buffer, canonStart, canonEnd, 8)
+
+        elif uuid == _cr3PreviewUuid:
+            # 8 bytes precede the PRVW box
+            for previewType, _, previewStart, previewEnd in _boxes(buffer, start + 8, end):
+                if previewType == b"PRVW":
+                    images["preview"] = _canonJpeg(buffer, previewStart, previewEnd, 12)
+
+    return images
+
+
+class RawPreviews:
+    # JPEG images embedded in a CR2 or CR3 file, as memoryviews over the
+    # memory-mapped file: they remain valid until release()
+    def __init__(self, path: str):
+        self.path = path
+
+        with open(path, "rb") as file:
+            try:
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f"'{path}' is empty") from None
+
+        self._buffer = memoryview(self._mmap)
+        try:
+            if self._buffer[:4] in (b"II*\x00", b"MM\x00*") and self._buffer[8:10] == b"CR":
+                self.format = "CR2"
+                images      = _parseCr2(self._buffer)
+            elif self._buffer[4:12] == b"ftypcrx ":
+                self.format = "CR3"
+                images      = _parseCr3(self._buffer)
+            else:
+                raise ValueError(f"'{path}' is neither a CR2 nor a CR3 file")
+
+        except (struct.error, KeyError) as error:
+            self.release()
+            raise ValueError(f"'{path}' is corrupted: {error}") from None
+        except ValueError:
+            self.release()
+            raise
+
+        self.preview   = images.get("preview")
+        self.thumbnail = images.get("thumbnail")
+
+    @property
+    def largest(self) -> memoryview | None:
+        return self.preview if self.preview is not None else self.thumbnail
+
+    def save(self, filename: str, image: str = "preview") -> str:
+        data = getattr(self, image)
+        if data is None:
+            raise ValueError(f"No {image} in '{self.path}'")
+
+        with open(filename, "wb") as file:
+            file.write(data)
+        return filename
+
+    def release(self):
+        for view in (getattr(self, "preview", None), getattr(self, "thumbnail", None), self._buffer):
+            if view is not None:
+                view.release()
+        self.preview = self.thumbnail = None
+
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass # Views still exported by the user, closed when collected
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exceptionType, exceptionValue, traceback):
+        self.release()
+
+
+def _processFile(path: str, function):
+    with RawPreviews(path) as previews:
+        return function(previews)
+
+def extractPreviews(directory: str, function, workers: int = 4, patterns: tuple = _rawPatterns):
+    # Calls function with the RawPreviews of every RAW file of the directory,
+    # on a pool of threads, and yields (path, result) in the order of the
+    # files. Views must not be kept once the function returned.
+    paths = sorted(entry.path for entry in os.scandir(directory)
+                   if entry.is_file() and any(fnmatch(entry.name, pattern) for pattern in patterns))
+
+    with ThreadPoolExecutor(workers) as executor:
+        results = executor.map(_processFile, paths, [function] * len(paths))
+        yield from zip(paths, results)
@@ -0,0 +1,36 @@
+import hashlib, json, os
+
+from .capture_metrics import CaptureRecord, _phaseDurations
+
+
+# Digests are computed while the item is downloaded: the hash objects are
+# updated with each chunk, on the thread which writes it.
+def _hashers(algorithms) -> dict:
+    return {algorithm: hashlib.new(algorithm) for algorithm in algorithms}
+
+
+def _sidecarRecord(itemInfo, hashers: dict, settings: dict, record: CaptureRecord, filename: str = None) -> dict:
+    # Everything known about a captured item, without reading it again
+    return {
+        "filename": filename,
+        "item": {
+            "szFileName": itemInfo.szFileName.decode(errors="replace"),
+            "format"    : itemInfo.format,
+            "dateTime"  : itemInfo.dateTime,
+            "size"      : itemInfo.size,
+        },
+        "digests" : {algorithm: hasher.hexdigest() for algorithm, hasher in hashers.items()},
+        "settings": settings,
+        "timings" : {**record._asdict(), **_phaseDurations(record)},
+    }
+
+
+def _writeSidecar(filename: str, sidecar: dict) -> str:
+    # Written next to the file, and renamed once complete, so that a reader
+    # never sees a partial sidecar
+    path = filename + ".json"
+    with open(path + ".tmp", "w") as file:
+        json.dump(sidecar, file, indent=2)
+    os.replace(path + ".tmp", path)
+
+    return path
@@ -0,0 +1,24 @@
+import platform
+import pytest
+
+from unittest.mock import MagicMock
+
+from pyedsdk.core._lib import lib
+
+
+# The EDSDK only exists on Windows. Elsewhere, the bindings are imported
+# against a stand-in library, and tests stub the functions they rely on.
+# Hardware tests can not run against it.
+_standInSDK = platform.system() != "Windows" and lib._lib is None
+if _standInSDK:
+    lib.load(MagicMock())
+
+
+def pytest_collection_modifyitems(config, items):
+    if not _standInSDK:
+        return
+
+    skipHardware = pytest.mark.skip(reason="EDSDK not available on this platform")
+    for item in items:
+        if "hardware" in item.keywords:
+            item.add_marker(skipHardware)
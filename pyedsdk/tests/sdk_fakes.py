@@ -0,0 +1,76 @@
+import ctypes
+
+
+from pyedsdk import download
+
+from pyedsdk.core._types import _DirectoryItemInfo
+
+
+# Stand-ins for the EDSDK download functions, shared by the test modules
+
+
+class FakeItem:
+    # Directory item reference of the fake SDK, transferred chunk by chunk
+    def __init__(self, data: bytes, name: bytes = b"IMG_0001.CR3"):
+        self.data      = data
+        self.offset    = 0
+        self.completed = False
+        self.cancelled = False
+        self.info      = _DirectoryItemInfo(size=len(data), szFileName=name)
+
+
+class FakeMemoryStream:
+    def __init__(self, size):
+        self.buffer   = ctypes.create_string_buffer(max(size, 1))
+        self.position = 0
+        self.released = False
+
+
+class FakeDownloadSDK:
+    # Stands in for the EDSDK download functions. As SDK memory streams do,
+    # a stream reallocates its buffer when a download does not fit in it.
+    _functions = ("_createMemoryStream", "_seek", "_download", "_getPointer", "_getPosition",
+                  "_downloadComplete", "_downloadCancel", "_release")
+
+    def __init__(self, monkeypatch, module=download):
+        self.streams = []
+
+        for name in self._functions:
+            if hasattr(module, name):
+                monkeypatch.setattr(module, name, getattr(self, name))
+
+    def _createMemoryStream(self, size):
+        stream = FakeMemoryStream(size)
+        self.streams.append(stream)
+        return stream
+
+    def _seek(self, stream, offset, origin):
+        stream.position = offset
+
+    def _download(self, item, size, stream):
+        data = item.data[item.offset:item.offset + size]
+        item.offset += size
+
+        end = stream.position + len(data)
+        if end > len(stream.buffer):
+            buffer = ctypes.create_string_buffer(end)
+            ctypes.memmove(buffer, stream.buffer, stream.position)
+            stream.buffer = buffer
+
+        ctypes.memmove(ctypes.addressof(stream.buffer) + stream.position, data, len(data))
+        stream.position = end
+
+    def _getPointer(self, stream):
+        return ctypes.c_void_p(ctypes.addressof(stream.buffer))
+
+    def _getPosition(self, stream):
+        return stream.position
+
+    def _downloadComplete(self, item):
+        item.completed = True
+
+    def _downloadCancel(self, item):
+        item.cancelled = True
+
+    def _release(self, stream):
+        stream.released = True
@@ -0,0 +1,91 @@
+import pytest
+import threading
+
+
+from pyedsdk.core import _callbacks
+from pyedsdk.core._callbacks import _EventPump, _acquireEventPump, _releaseEventPump, _waitForEvent
+from pyedsdk.core._callbacks import _pumpWhileWaiting
+
+
+def test_event_pump_runs_backend_and_wakes_waiters():
+    event = threading.Event()
+    pump  = _acquireEventPump(event.set, interval=0.001)
+    try:
+        assert pump.running
+        assert pump.waitTick(1)
+
+        # Event is set from the pump thread
+        _waitForEvent(event, timeout=1)
+
+    finally:
+        _releaseEventPump()
+
+    assert not pump.running
+    assert _callbacks._eventPump is None
+
+
+def test_event_pump_is_shared():
+    first  = _acquireEventPump(_callbacks._pumpNothing)
+    second = _acquireEventPump(_callbacks._pumpNothing)
+    assert first is second
+
+    _releaseEventPump()
+    assert first.running
+
+    _releaseEventPump()
+    assert not first.running
+
+
+def test_event_pump_rejects_other_settings():
+    pump = _acquireEventPump(_callbacks._pumpNothing, interval=0.001)
+    try:
+        with pytest.raises(ValueError):
+            _acquireEventPump(_callbacks._pumpWindowsMessages, interval=0.001)
+        with pytest.raises(ValueError):
+            _acquireEventPump(_callbacks._pumpNothing, interval=0.01)
+        assert pump._users == 1
+    finally:
+        _releaseEventPump()
+
+
+def test_wait_for_event_timeout_without_pump():
+    with pytest.raises(TimeoutError):
+        _waitForEvent(threading.Event(), timeout=0.02)
+
+
+def test_event_pump_survives_backend_errors():
+    def backend():
+        raise RuntimeError("SDK not ready")
+
+    pump = _EventPump(backend, interval=0.001)
+    pump.start()
+    try:
+        assert pump.waitTick(1)
+        assert pump.waitTick(1)
+    finally:
+        pump.stop()
+
+
+def test_windows_messages_pumped_by_waiting_thread(monkeypatch):
+    # Events dispatched through the message queue of the waiting thread, as
+    # on Windows: they are pumped there even with the pump thread running
+    event   = threading.Event()
+    pumpers = []
+
+    def pumpMessages():
+        pumpers.append(threading.current_thread())
+        if len(pumpers) == 3:
+            event.set()
+
+    monkeypatch.setattr(_callbacks, "_hasMessageQueue", lambda: True)
+    monkeypatch.setattr(_callbacks, "_pumpWindowsMessages", pumpMessages)
+
+    _acquireEventPump(_callbacks._pumpNothing, interval=0.001)
+    try:
+        _waitForEvent(event, timeout=1)
+        _pumpWhileWaiting(0.01)
+    finally:
+        _releaseEventPump()
+
+    assert len(pumpers) == 4
+    assert set(pumpers) == {threading.current_thread()}
@@ -0,0 +1,348 @@
+import hashlib
+import io
+import json
+import os
+import pytest
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+from pyedsdk                 import burst, download
+from pyedsdk.burst           import _Burst
+from pyedsdk.capture         import _CapturePipeline, _itemsPerShot
+from pyedsdk.download        import _MemoryDownload, _MemoryDownloadPool, _SinkDownload, HostFileWriter
+from pyedsdk.capture_metrics import CaptureMetrics, CaptureRecord, jsonLinesExporter
+from pyedsdk.sidecar         import _hashers, _sidecarRecord, _writeSidecar
+
+from pyedsdk.core._types import _DirectoryItemInfo
+
+from sdk_fakes import FakeDownloadSDK, FakeItem
+
+
+def test_capture_pipeline_matches_transfers_in_order():
+    pipeline = _CapturePipeline(maxInFlight=2)
+
+    first  = pipeline.submit(lambda: None, ["first"])
+    second = pipeline.submit(lambda: None, ["second"])
+    assert pipeline.inFlight == 2
+
+    # Third capture waits for a free slot
+    with pytest.raises(TimeoutError):
+        pipeline.submit(lambda: None, ["third"], timeout=0.05)
+
+    for future in (first, second):
+        capture, index = pipeline.next()
+        capture.itemDone(index, capture.targets[index])
+
+    assert (first.result(), second.result()) == ("first", "second")
+    assert pipeline.inFlight == 0
+    assert pipeline.next() == (None, None)
+
+
+def test_capture_pipeline_waits_for_every_item():
+    pipeline = _CapturePipeline()
+    future   = pipeline.submit(lambda: None, ["raw", "jpeg"])
+    other    = pipeline.submit(lambda: None, ["next"])
+
+    raw,  rawIndex  = pipeline.next()
+    jpeg, jpegIndex = pipeline.next()
+    assert raw is jpeg and (rawIndex, jpegIndex) == (0, 1)
+
+    # Items may complete in any order
+    jpeg.itemDone(jpegIndex, "image.JPG")
+    assert not future.done()
+    raw.itemDone(rawIndex, "image.CR3")
+    assert future.result() == ["image.CR3", "image.JPG"]
+
+    capture, index = pipeline.next()
+    capture.itemDone(index, error=OSError("disk full"))
+    with pytest.raises(OSError):
+        other.result()
+
+
+def test_items_per_shot():
+    assert _itemsPerShot(0x0064FF0F) == 1 # RAW
+    assert _itemsPerShot(0x0013FF0F) == 1 # Large fine JPEG
+    assert _itemsPerShot(0x00640013) == 2 # RAW + large fine JPEG
+
+
+def test_capture_pipeline_releases_slot_on_trigger_error():
+    pipeline = _CapturePipeline(maxInFlight=1)
+
+    def trigger():
+        raise RuntimeError("busy")
+
+    with pytest.raises(RuntimeError):
+        pipeline.submit(trigger, ["target"])
+
+    assert pipeline.inFlight == 0
+    assert pipeline.next() == (None, None)
+
+
+def test_capture_pipeline_expires():
+    pipeline = _CapturePipeline(maxInFlight=1, timeout=0.05)
+
+    future = pipeline.submit(lambda: None, ["target"])
+    with pytest.raises(TimeoutError):
+        future.result(timeout=1)
+    assert pipeline.next() == (None, None)
+
+
+def test_memory_download_reuses_its_stream(monkeypatch):
+    sdk    = FakeDownloadSDK(monkeypatch)
+    target = _MemoryDownload()
+
+    first = FakeItem(b"first" * 20)
+    view  = target(first, first.info)
+    assert view.readonly and view.tobytes() == first.data
+    assert first.completed
+
+    # Larger item: the same stream grows, and the previous view is invalidated
+    second  = FakeItem(b"second" * 50)
+    hashers = _hashers(["sha256"])
+    assert target(second, second.info, None, hashers).tobytes() == second.data
+    assert hashers["sha256"].hexdigest() == hashlib.sha256(second.data).hexdigest()
+    with pytest.raises(ValueError):
+        view.tobytes()
+
+    assert len(sdk.streams) == 1
+    target.release()
+    assert sdk.streams[0].released
+
+
+def test_memory_downloads_of_each_capture(monkeypatch):
+    FakeDownloadSDK(monkeypatch)
+    pool = _MemoryDownloadPool(captures=1)
+
+    first, second = pool.acquire(), pool.acquire()
+    assert first is not second
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.01)
+
+    # Result of a capture is not overwritten by the next one
+    item = FakeItem(b"first")
+    view = first[0](item, item.info)
+    pool.giveBack(first)
+
+    other = FakeItem(b"second")
+    assert second[0](other, other.info).tobytes() == b"second"
+    assert view.tobytes() == b"first"
+
+    pool.giveBack(second)
+    assert pool.acquire() is first
+    pool.release()
+
+
+def test_captures_in_flight_download_to_their_own_streams(monkeypatch):
+    sdk      = FakeDownloadSDK(monkeypatch)
+    pool     = _MemoryDownloadPool(captures=2)
+    pipeline = _CapturePipeline(maxInFlight=2)
+
+    # Two RAW+JPEG captures in flight, their items downloaded by two workers
+    futures = [pipeline.submit(lambda: None, pool.acquire()[:2]) for _ in range(2)]
+    items   = [FakeItem(b"%s of shot %d" % (kind, shot)) for shot in range(2) for kind in (b"raw", b"jpeg")]
+
+    def downloadItem(capture, index, item):
+        capture.itemDone(index, capture.targets[index](item, item.info))
+
+    # Transfers are matched in order, as by the object event handler
+    with ThreadPoolExecutor(2) as workers:
+        for item in items:
+            workers.submit(downloadItem, *pipeline.next(), item)
+
+    results = [[view.tobytes() for view in future.result()] for future in futures]
+    assert results == [[b"raw of shot 0", b"jpeg of shot 0"], [b"raw of shot 1", b"jpeg of shot 1"]]
+    assert len(sdk.streams) == 4
+
+
+def test_sink_download_chunks(monkeypatch):
+    sdk   = FakeDownloadSDK(monkeypatch)
+    item  = FakeItem(bytes(range(256)) * 5)
+    sizes = []
+    sink  = io.BytesIO()
+
+    def record(chunk):
+        sizes.append(len(chunk))
+        sink.write(chunk)
+
+    assert _SinkDownload(record, chunkSize=512)(item, item.info) is record
+    assert sizes == [512, 512, 256]
+    assert sink.getvalue() == item.data
+    assert item.completed and not item.cancelled
+
+    # Streams created for the download are released with it
+    assert len(sdk.streams) == 2 and all(stream.released for stream in sdk.streams)
+
+
+def test_sink_download_cancels_on_sink_error(monkeypatch):
+    sdk  = FakeDownloadSDK(monkeypatch)
+    item = FakeItem(bytes(512 * 8))
+
+    def failing(chunk):
+        raise OSError("disk full")
+
+    # Given streams are left to the caller
+    streams = [sdk._createMemoryStream(512) for _ in range(2)]
+    with pytest.raises(OSError):
+        _SinkDownload(failing, chunkSize=512, streams=streams)(item, item.info)
+
+    assert item.cancelled and not item.completed
+    assert item.offset < len(item.data)
+    assert not any(stream.released for stream in streams)
+
+
+def test_host_file_writer_preallocates(monkeypatch, tmp_path):
+    sdk       = FakeDownloadSDK(monkeypatch)
+    allocated = []
+    monkeypatch.setattr(download, "_preallocate", lambda fd, size: allocated.append(size))
+
+    with HostFileWriter(chunkSize=512) as writer:
+        for n, preallocate in enumerate((True, False)):
+            writer.preallocate = preallocate
+            item     = FakeItem(bytes(range(256)) * 3)
+            filename = writer.write(item, item.info, str(tmp_path / f"{n}.CR3"))
+            with open(filename, "rb") as file:
+                assert file.read() == item.data
+
+    assert allocated == [768]
+
+    # Streams are shared by the files of the writer
+    assert len(sdk.streams) == 2 and all(stream.released for stream in sdk.streams)
+
+
+def test_host_file_writer_fsync_policies(monkeypatch, tmp_path):
+    FakeDownloadSDK(monkeypatch)
+    synced = []
+    monkeypatch.setattr(os, "fsync", synced.append)
+
+    def writeFiles(writer, count):
+        for n in range(count):
+            item = FakeItem(b"image")
+            writer.write(item, item.info, str(tmp_path / f"{n}.JPG"))
+
+    with HostFileWriter(fsync="never") as writer:
+        writeFiles(writer, 2)
+    assert synced == []
+
+    with HostFileWriter(fsync="file") as writer:
+        writeFiles(writer, 2)
+    assert len(synced) == 2
+
+    synced.clear()
+    writer = HostFileWriter(fsync="batch", batchSize=2)
+    writeFiles(writer, 3)
+    assert len(synced) == 2
+
+    # Last file is synced on close
+    writer.close()
+    assert len(synced) == 3
+
+
+def test_host_file_writer_removes_partial_file(monkeypatch, tmp_path):
+    FakeDownloadSDK(monkeypatch)
+
+    def failing(item, size, stream):
+        raise OSError("link lost")
+    monkeypatch.setattr(download, "_download", failing)
+
+    item = FakeItem(b"image")
+    with HostFileWriter() as writer, pytest.raises(OSError):
+        writer.write(item, item.info, str(tmp_path / "image.JPG"))
+
+    assert item.cancelled
+    assert not os.path.exists(tmp_path / "image.JPG")
+
+
+def test_burst_counts_shots_and_writes_items(monkeypatch, tmp_path):
+    FakeDownloadSDK(monkeypatch, burst)
+    shots = _Burst(str(tmp_path / "{index}_{name}{ext}"), writers=2, maxQueued=1, itemsPerShot=2)
+    shots.start()
+
+    items = [FakeItem(b"image %d" % n, b"IMG_%04d.%s" % (n // 2, b"JPG" if n % 2 else b"CR3"))
+             for n in range(4)]
+    for item in items:
+        assert not shots.done(count=2)
+        shots.transfer(item, item.info)
+    assert shots.done(count=2)
+
+    report = shots.finish()
+    assert (report.frames, report.items) == (2, 4)
+    assert report.bytes == sum(len(item.data) for item in items)
+    assert report.fps == pytest.approx(2 / report.duration)
+    assert all(item.completed for item in items)
+    with open(tmp_path / "3_IMG_0001.JPG", "rb") as file:
+        assert file.read() == b"image 3"
+
+
+def test_burst_errors(monkeypatch, tmp_path):
+    FakeDownloadSDK(monkeypatch, burst)
+
+    def failing(item, size, stream):
+        raise OSError("link lost")
+    monkeypatch.setattr(burst, "_download", failing)
+
+    item = FakeItem(b"image")
+    for finish in ("finish", "close"):
+        shots = _Burst(str(tmp_path / "{index}{ext}"))
+        shots.start()
+        shots.transfer(item, item.info)
+
+        # Errors of the downloads are only raised once the burst succeeded
+        if finish == "finish":
+            with pytest.raises(OSError):
+                shots.finish()
+        else:
+            shots.close()
+        assert item.cancelled
+
+    # Burst failing before it started
+    _Burst(str(tmp_path / "{index}{ext}")).close()
+
+def test_capture_metrics_phases_and_export():
+    metrics = CaptureMetrics(size=2)
+    output  = io.StringIO()
+    metrics.setExporter(jsonLinesExporter(output))
+
+    for n in range(3):
+        start = 10. * n
+        metrics.record(CaptureRecord(start, start + .1, start + 1., start + 1.5, start + 3.5, start + 3.75, 20e6))
+
+    # Ring keeps the last records, counters keep everything
+    records = metrics.records()
+    assert [record.triggered for record in records] == [10., 20.]
+
+    stats = metrics.stats()
+    assert stats["items"] == 3 and stats["bytes"] == 60e6
+    assert stats["download"]["p50"] == pytest.approx(2.)
+    assert stats["total"]["max"] == pytest.approx(3.75)
+    assert stats["throughput"]["mean"] == pytest.approx(10.)
+
+    lines = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert len(lines) == 3 and lines[0]["queue"] == pytest.approx(.5)
+
+    text = metrics.openMetrics()
+    assert 'pyedsdk_capture_phase_seconds_count{phase="download"} 2' in text
+    assert "pyedsdk_capture_bytes_total 60000000\n" in text
+    assert text.endswith("# EOF\n")
+
+
+def test_sidecar_record(tmp_path):
+    itemInfo = _DirectoryItemInfo(size=6, format=0xB108, dateTime=1700000000, szFileName=b"IMG_0001.CR3")
+
+    hashers = _hashers(["sha256", "md5"])
+    for chunk in (b"abc", b"def"):
+        hashers["sha256"].update(chunk)
+        hashers["md5"].update(chunk)
+
+    record   = CaptureRecord(0., .1, 1., 1.5, 3.5, 3.75, 6)
+    filename = str(tmp_path / "image.CR3")
+    sidecar  = _sidecarRecord(itemInfo, hashers, {"isoSpeed": 100}, record, filename)
+
+    path = _writeSidecar(filename, sidecar)
+    with open(path) as file:
+        written = json.load(file)
+
+    assert written["item"]["szFileName"] == "IMG_0001.CR3"
+    assert written["digests"]["sha256"] == hashlib.sha256(b"abcdef").hexdigest()
+    assert written["settings"] == {"isoSpeed": 100}
+    assert written["timings"]["download"] == pytest.approx(2.)
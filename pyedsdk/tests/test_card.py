@@ -0,0 +1,190 @@
+import os
+import pytest
+
+
+from pyedsdk           import card
+from pyedsdk.card      import _readVolumes
+from pyedsdk.card_sync import CardSync
+
+from pyedsdk.core._types import _VolumeInfo
+
+from sdk_fakes import FakeDownloadSDK, FakeItem
+
+
+class FakeCard:
+    # Stands in for the EDSDK directory functions, over a tree of FakeItems
+    # built from nested dicts (folders) and bytes (files)
+    def __init__(self, monkeypatch, tree: dict, label: bytes = b"SD"):
+        self.enumerated = []
+        self.deleted    = []
+
+        self.volume       = self.folder(label, tree, None)
+        self.volume.label = label
+        self.camera       = self.folder(b"camera", {}, None)
+        self.camera.children.append(self.volume)
+
+        for name in ("_getChildCount", "_getChildAtIndex", "_getDirectoryItemInfo", "_getVolumeInfo",
+                     "_deleteDirectoryItem", "_release"):
+            monkeypatch.setattr(card, name, getattr(self, name))
+
+    def folder(self, name: bytes, content: dict, parent):
+        folder = FakeItem(b"", name)
+        folder.info.isFolder = 1
+        folder.parent        = parent
+        folder.children      = [self.add(folder, childName, childContent)
+                                for childName, childContent in content.items()]
+        return folder
+
+    def add(self, parent, name: str, content):
+        if isinstance(content, dict):
+            return self.folder(name.encode(), content, parent)
+
+        item = FakeItem(content, name.encode())
+        item.parent = parent
+        return item
+
+    def _getChildCount(self, ref):
+        self.enumerated.append(ref)
+        return len(ref.children)
+
+    def _getChildAtIndex(self, ref, index):
+        return ref.children[index]
+
+    def _getDirectoryItemInfo(self, ref):
+        return ref.info
+
+    def _getVolumeInfo(self, ref):
+        return _VolumeInfo(maxCapacity=1 << 30, szVolumeLabel=ref.label)
+
+    def _deleteDirectoryItem(self, ref):
+        ref.parent.children.remove(ref)
+        self.deleted.append(ref)
+
+    def _release(self, ref):
+        ref.released = True
+
+
+def test_card_glob_enumerates_lazily(monkeypatch):
+    sdk = FakeCard(monkeypatch, {
+        "DCIM": {"100CANON": {"IMG_0001.CR3": b"raw", "IMG_0001.JPG": b"jpeg"},
+                 "101CANON": {"IMG_0002.CR3": b"raw"}},
+        "MISC": {"AUTPRINT.MRK": b"print"},
+    })
+    volume, = _readVolumes(sdk.camera)
+    assert volume.name == "SD" and volume.path == "/"
+
+    raws = list(volume.glob("dcim/*/*.cr3"))
+    assert [item.path for item in raws] == ["/DCIM/100CANON/IMG_0001.CR3", "/DCIM/101CANON/IMG_0002.CR3"]
+
+    # Folders not matching the pattern are not enumerated
+    sdk.enumerated.clear()
+    other, = _readVolumes(sdk.camera)
+    list(other.glob("DCIM/100*/*"))
+    assert [ref.info.szFileName for ref in sdk.enumerated] == [b"camera", b"SD", b"DCIM", b"100CANON"]
+
+    # Enumerated folders are cached
+    sdk.enumerated.clear()
+    assert [item.name for item in volume.glob("DCIM/**/*.JPG")] == ["IMG_0001.JPG"]
+    assert sdk.enumerated == []
+
+
+def test_card_refresh(monkeypatch):
+    sdk = FakeCard(monkeypatch, {"DCIM": {"100CANON": {"IMG_0001.CR3": b"raw"}}})
+    volume, = _readVolumes(sdk.camera)
+    folder  = volume["DCIM"]["100CANON"]
+    first   = folder["IMG_0001.CR3"]
+
+    # Picture taken meanwhile
+    node = sdk.volume.children[0].children[0]
+    node.children.append(sdk.add(node, "IMG_0002.CR3", b"raw"))
+    assert len(list(volume.glob("**/*.CR3"))) == 1
+
+    # Cached children are released, and enumerated again when needed
+    volume.refresh()
+    assert first._ref is None and folder._ref is None
+    assert len(list(volume.glob("**/*.CR3"))) == 2
+
+
+class FakeCardCamera:
+    def __init__(self, fakeCard: FakeCard):
+        self._card = fakeCard
+
+    def volumes(self, refresh: bool = False) -> list:
+        return _readVolumes(self._card.camera)
+
+
+def test_card_sync_deletes_while_scanning(monkeypatch, tmp_path):
+    FakeDownloadSDK(monkeypatch)
+    images = {f"IMG_{n:04d}.CR3": b"image %d" % n for n in range(8)}
+    sdk    = FakeCard(monkeypatch, {"DCIM": {"100CANON": images}})
+
+    # Scanner is held by the queue while the items it enumerated are deleted
+    with CardSync(FakeCardCamera(sdk), str(tmp_path), queueSize=1, delete=True) as sync:
+        report = sync.run()
+        assert (report.scanned, report.downloaded, report.deleted, report.failed) == (8, 8, 8, 0)
+        assert sync.run().scanned == 0
+
+    folder = tmp_path / "SD" / "DCIM" / "100CANON"
+    assert sorted(os.listdir(folder)) == sorted(images)
+    assert (folder / "IMG_0003.CR3").read_bytes() == b"image 3"
+    assert len(sdk.deleted) == 8
+
+
+def test_card_sync_deletes_items_left_by_interrupted_sync(monkeypatch, tmp_path):
+    FakeDownloadSDK(monkeypatch)
+    sdk  = FakeCard(monkeypatch, {"DCIM": {"100CANON": {"IMG_0001.CR3": b"image"}}})
+    item = sdk.volume.children[0].children[0].children[0]
+
+    def failing(ref):
+        raise OSError("card locked")
+
+    with CardSync(FakeCardCamera(sdk), str(tmp_path), delete=True) as sync:
+        # Item is downloaded, but not deleted
+        monkeypatch.setattr(card, "_deleteDirectoryItem", failing)
+        report = sync.run()
+        assert (report.downloaded, report.deleted, report.failed) == (1, 0, 1)
+
+        # Next sync only deletes it
+        item.completed = False
+        monkeypatch.setattr(card, "_deleteDirectoryItem", sdk._deleteDirectoryItem)
+        report = sync.run()
+        assert (report.scanned, report.skipped, report.downloaded, report.deleted, report.failed) == (1, 0, 0, 1, 0)
+        assert report.bytes == 0 and not item.completed
+        assert sdk.deleted == [item]
+
+        assert list(sync._db.execute("SELECT state FROM items")) == [("deleted",)]
+
+    folder = tmp_path / "SD" / "DCIM" / "100CANON"
+    assert (folder / "IMG_0001.CR3").read_bytes() == b"image"
+
+
+def test_card_sync_verifies_received_bytes(monkeypatch, tmp_path):
+    FakeDownloadSDK(monkeypatch)
+    sdk = FakeCard(monkeypatch, {"DCIM": {"100CANON": {"IMG_0001.CR3": b"image"}}})
+
+    # Camera transfers less than the size of the item
+    item = sdk.volume.children[0].children[0].children[0]
+    item.info.size += 512
+
+    with CardSync(FakeCardCamera(sdk), str(tmp_path), delete=True) as sync:
+        report = sync.run()
+
+    assert (report.downloaded, report.deleted, report.failed) == (0, 0, 1)
+    assert os.listdir(tmp_path / "SD" / "DCIM" / "100CANON") == []
+    assert item.cancelled and sdk.deleted == []
+
+
+def test_card_sync_raises_scan_errors(monkeypatch, tmp_path):
+    FakeDownloadSDK(monkeypatch)
+    sdk = FakeCard(monkeypatch, {"DCIM": {"100CANON": {"IMG_0001.CR3": b"image"}}})
+
+    def failing(ref):
+        raise OSError("card removed")
+
+    volume, = _readVolumes(sdk.camera)
+    monkeypatch.setattr(card, "_getChildCount", failing)
+    camera = FakeCardCamera(sdk)
+    monkeypatch.setattr(camera, "volumes", lambda refresh=False: [volume])
+
+    with CardSync(camera, str(tmp_path)) as sync, pytest.raises(OSError):
+        sync.run()
@@ -0,0 +1,567 @@
+import asyncio
+import ctypes
+import pytest
+import socket
+import struct
+import threading
+import time
+
+
+from pyedsdk.live_view_frame    import LiveViewFrame
+from pyedsdk.live_view_pool     import FramePool
+from pyedsdk.live_view_consumer import LiveViewConsumer
+from pyedsdk.live_view_async    import _AsyncFrameSource
+from pyedsdk.live_view_decoder  import FrameDecoder, JpegHeader
+from pyedsdk.live_view_focus    import FocusScorer, laplacianVariance, tenengrad, _score
+from pyedsdk.live_view_recorder import LiveViewRecorder, LiveViewRecording
+
+from pyedsdk.live_view_shared_memory import SharedFramePublisher, SharedFrameReader
+
+from pyedsdk import live_view_focus, live_view_metadata, live_view_metrics, live_view_pacing, live_view_stream
+from pyedsdk.live_view_metrics import LiveViewMetrics, _RollingWindow
+from pyedsdk.live_view_metadata import _readEvfMetadata
+from pyedsdk.live_view_pacing import FramePacer
+from pyedsdk.live_view_stream import LiveViewStream
+from pyedsdk.live_view_server import LiveViewServer
+
+from pyedsdk.core._errors import CanonError, _ErrorCode
+from pyedsdk.core._types  import _FocusInfo, _Point, _PropertyID, _Rect
+
+
+class FakeStream:
+    # Mimics the acquisition side of a LiveViewStream, without any camera
+    def __init__(self, frameCount):
+        self._running    = True
+        self._sequence   = 0
+        self._frameCount = frameCount
+
+    def _acquireFrame(self):
+        if self._sequence == self._frameCount:
+            self._running = False
+            raise RuntimeError("Live view not started")
+
+        self._sequence += 1
+        return LiveViewFrame(memoryview(b"frame"), self._sequence)
+
+
+class FakeCamera:
+    _cameraRef = None
+
+    def _startLiveView(self):
+        pass
+
+    def _endLiveView(self):
+        pass
+
+
+class FakeEvfSDK:
+    # Stands in for the EDSDK live view functions: every download writes the
+    # next image into the same buffer, as the SDK memory stream does
+    def __init__(self, monkeypatch, images=None):
+        self._buffer    = ctypes.create_string_buffer(max([256] + [len(image) for image in images or []]))
+        self._length    = 0
+        self._images    = images
+        self.downloads  = 0
+
+        monkeypatch.setattr(live_view_stream, "_createMemoryStream", lambda *args: object())
+        monkeypatch.setattr(live_view_stream, "_createEvfImageRef",  lambda stream: object())
+        monkeypatch.setattr(live_view_stream, "_release",            lambda ref: None)
+        monkeypatch.setattr(live_view_stream, "_downloadEvfImage",   self._downloadEvfImage)
+        monkeypatch.setattr(live_view_stream, "_getPointer",         self._getPointer)
+        monkeypatch.setattr(live_view_stream, "_getLength",          lambda stream: self._length)
+
+    def _downloadEvfImage(self, cameraRef, evfImage):
+        if self._images is not None:
+            image = self._images[min(self.downloads, len(self._images) - 1)]
+        else:
+            image = b"\xff\xd8image-%04d\xff\xd9" % self.downloads
+
+        self.downloads += 1
+        ctypes.memmove(self._buffer, image, len(image))
+        self._length = len(image)
+
+    def _getPointer(self, stream):
+        return ctypes.c_void_p(ctypes.addressof(self._buffer))
+
+
+def test_frame_pool_reuses_slots():
+    pool = FramePool(capacity=2, slotSize=16)
+
+    for sequence in range(10):
+        with pool.frameFrom(memoryview(b"frame-%d" % sequence), sequence) as frame:
+            assert frame.tobytes() == b"frame-%d" % sequence
+
+    stats = pool.stats()
+    assert stats["hits"]      == 10
+    assert stats["misses"]    == 0
+    assert stats["inUse"]     == 0
+    assert stats["highWater"] == 1
+
+
+def test_frame_pool_overflow_policies():
+    pool   = FramePool(capacity=1, slotSize=4, overflow="allocate")
+    first  = pool.frameFrom(memoryview(b"abcdefgh"))
+    second = pool.frameFrom(memoryview(b"ijkl"))
+
+    assert first.tobytes() == b"abcdefgh" and second.tobytes() == b"ijkl"
+    assert pool.stats()["grown"] == 1 and pool.stats()["misses"] == 1
+
+    first.release()
+    second.release()
+
+    pool  = FramePool(capacity=1, slotSize=4, overflow="raise")
+    frame = pool.frameFrom(memoryview(b"abcd"))
+    with pytest.raises(RuntimeError):
+        pool.frameFrom(memoryview(b"abcd"))
+
+    frame.release()
+    with pytest.raises(RuntimeError):
+        frame.data
+
+
+def test_consumer_drop_policies():
+    latest = LiveViewConsumer(maxSize=1, policy="dropOldest")
+    oldest = LiveViewConsumer(maxSize=1, policy="dropNewest")
+
+    for sequence in range(5):
+        frame = LiveViewFrame(memoryview(b"frame"), sequence)
+        latest._push(frame._retain())
+        oldest._push(frame._retain())
+        frame.release()
+
+    with latest.get(timeout=1) as frame:
+        assert frame.sequence == 4
+    with oldest.get(timeout=1) as frame:
+        assert frame.sequence == 0
+
+    assert latest.stats() == {"delivered": 1, "dropped": 4, "pending": 0}
+    assert oldest.stats() == {"delivered": 1, "dropped": 4, "pending": 0}
+
+    latest.close()
+    assert list(latest) == []
+
+
+def test_async_frame_source():
+    async def consume(source):
+        sequences = []
+        while True:
+            try:
+                frame = await source.next()
+            except StopAsyncIteration:
+                return sequences
+
+            with frame:
+                sequences.append(frame.sequence)
+
+    async def main():
+        source = _AsyncFrameSource(FakeStream(10), maxSize=2)
+        results = await asyncio.gather(consume(source), consume(source))
+        source.close()
+        return results
+
+    first, second = asyncio.run(main())
+    assert sorted(first + second) == list(range(1, 11))
+
+
+def _jpegHeader(width, height):
+    # Minimal JPEG start: SOI, an APP0 segment and a baseline frame header
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + bytes(9)
+    sof0 = b"\xff\xc0" + struct.pack(">HBHHB", 11, 8, height, width, 3) + bytes(3)
+    return b"\xff\xd8" + app0 + sof0
+
+
+def test_frame_decoder_keeps_order():
+    frames = [LiveViewFrame(memoryview(_jpegHeader(640 + i, 480)), i) for i in range(20)]
+
+    with FrameDecoder(workers=4, scale=4, backend="header") as decoder:
+        decoded = list(decoder.map(iter(frames)))
+
+    assert [frame.sequence for frame in decoded] == list(range(20))
+    assert decoded[0].image == JpegHeader(160, 120, 3)
+    assert decoded[3].image == JpegHeader(161, 120, 3)
+
+
+def test_recording_index(tmp_path):
+    path = str(tmp_path / "session.mjpeg")
+
+    class Stream:
+        def subscribe(self, maxSize, policy):
+            self.consumer = LiveViewConsumer(maxSize, policy)
+            return self.consumer
+
+        def unsubscribe(self, consumer, drain=False):
+            consumer.close(drain=drain)
+
+    stream   = Stream()
+    recorder = LiveViewRecorder(path)
+    recorder.start(stream)
+    for sequence in range(1, 101):
+        stream.consumer._push(LiveViewFrame(memoryview(b"jpeg-%d" % sequence), sequence, 10 + sequence / 25))
+    recorder.stop()
+
+    assert recorder.stats() == {"frames": 100, "bytes": sum(len(b"jpeg-%d" % i) for i in range(1, 101)), "dropped": 0}
+
+    with LiveViewRecording(path) as recording:
+        assert len(recording) == 100
+        assert bytes(recording.frame(41)) == b"jpeg-42"
+        assert recording.sequence(-1) == 100
+        assert bytes(recording.frameAt(1.0)) == b"jpeg-26"
+        assert recording.indexAt(-1.) == 0
+
+
+def test_shared_memory_ring():
+    with SharedFramePublisher(slotCount=2, slotSize=16) as publisher:
+        with SharedFrameReader(publisher.name) as reader:
+            assert reader.latest() is None
+
+            first = publisher.write(b"first", 1.)
+            with reader.wait(timeout=1) as frame:
+                assert (frame.sequence, frame.timestamp, bytes(frame.data)) == (first, 1., b"first")
+
+            publisher.write(b"second")
+            publisher.write(b"third")
+            assert reader.read(first) is None
+            assert publisher.write(bytes(17)) == 0 and publisher.oversized == 1
+
+            with reader.latest() as frame:
+                assert bytes(frame.data) == b"third" and frame.valid()
+
+
+def test_focus_metrics():
+    np = pytest.importorskip("numpy")
+
+    sharp   = np.tile(np.array([[0, 255] * 16, [255, 0] * 16], dtype=np.uint8), (16, 1))
+    edge    = np.repeat(np.array([[0] * 16 + [255] * 16], dtype=np.uint8), 32, axis=0)
+    blurred = np.full((32, 32), 128, dtype=np.uint8)
+
+    assert laplacianVariance(sharp) > laplacianVariance(blurred) == 0.
+    assert tenengrad(edge) > tenengrad(blurred) == 0.
+    assert _score("laplacian", (0, 0, 16, 16), 2, sharp) == laplacianVariance(sharp[:8, :8])
+
+
+def test_focus_scorer_needs_decoded_images(monkeypatch):
+    with pytest.raises(ValueError):
+        FocusScorer(backend="header")
+
+    monkeypatch.setattr(live_view_focus, "_defaultBackend", lambda: "header")
+    with pytest.raises(ImportError):
+        FocusScorer()
+
+
+class FakeClock:
+    # Stands in for the time module: sleeping only moves the clock forward
+    def __init__(self):
+        self.now    = 100.
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, delay):
+        self.sleeps.append(delay)
+        self.now += delay
+
+
+def test_frame_pacer_learns_refresh_interval(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(live_view_pacing, "time", clock)
+
+    # Camera refreshing its image every 50 ms
+    refresh = 0.05
+    pacer   = FramePacer()
+    last    = int(clock.now / refresh)
+    for _ in range(200):
+        pacer.wait()
+
+        retries = 0
+        while int(clock.now / refresh) == last:
+            retries += 1
+            pacer.backoff(retries)
+
+        last = int(clock.now / refresh)
+        pacer.frameReceived(retries)
+
+    assert pacer.interval == pytest.approx(refresh, rel=0.1)
+
+
+def test_frame_pacer_backoff_is_capped(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(live_view_pacing, "time", clock)
+
+    pacer = FramePacer(initialInterval=0.04, minBackoff=0.001)
+    for attempt in range(1, 10):
+        pacer.backoff(attempt)
+
+    assert clock.sleeps[:3] == [0.001, 0.002, 0.004]
+    assert max(clock.sleeps) == pytest.approx(0.04 / 8)
+
+
+def test_frame_pacer_target_fps(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(live_view_pacing, "time", clock)
+
+    # First frame is not waited for
+    pacer = FramePacer(targetFps=10)
+    pacer.wait()
+    assert clock.sleeps == []
+
+    # Next one is not downloaded before 1/10 s, although the camera is faster
+    pacer.frameReceived(0)
+    received = clock.now
+    pacer.wait()
+    assert clock.now - received == pytest.approx(0.1)
+
+    pacer.targetFps = None
+    pacer.frameReceived(0)
+    received = clock.now
+    pacer.wait()
+    assert clock.now - received == pytest.approx(pacer.interval * 0.85)
+
+
+def test_rolling_window():
+    window = _RollingWindow(4)
+    assert window.summary() is None
+
+    # Oldest values are overwritten
+    for value in (6, 1, 2, 3, 4, 5):
+        window.add(value)
+    assert len(window) == 4
+
+    summary = window.summary(percentiles=(25, 50, 90, 100))
+    assert summary["mean"] == 3.5 and summary["max"] == 5
+    assert (summary["p25"], summary["p50"], summary["p90"], summary["p100"]) == (2, 3, 5, 5)
+
+
+def test_live_view_metrics_fps_and_reporter(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(live_view_metrics, "time", clock)
+
+    reports = []
+    metrics = LiveViewMetrics(windowSize=8)
+    metrics.setReporter(reports.append, period=1.)
+
+    # 20 fps for 2.5 seconds: reported once per second
+    for n in range(51):
+        metrics.recordFrame(0.01, n % 2, 1000, clock.now + n / 20)
+
+    assert len(reports) == 2
+    assert [report["frames"] for report in reports] == [21, 41]
+
+    stats = metrics.stats()
+    assert stats["frames"] == 51
+    assert stats["fps"] == pytest.approx(20.)
+    assert stats["retries"]["max"] == 1 and stats["callbackTime"] is None
+
+
+def test_evf_metadata(monkeypatch):
+    histogram = (ctypes.c_uint32 * 1024)(*range(1024))
+    focusInfo = _FocusInfo(pointNumber=3)
+    for index, (valid, selected) in enumerate([(1, 1), (0, 1), (1, 0)]):
+        point = focusInfo.focusPoint[index]
+        point.valid, point.selected, point.rect = valid, selected, _Rect(_Point(index, 0))
+
+    # Only some of the live view properties are supported by this camera
+    structs = {_PropertyID._Evf_Histogram: histogram, _PropertyID._FocusInfo: focusInfo,
+               _PropertyID._Evf_ImagePosition: _Point(16, 32)}
+    data    = {_PropertyID._Evf_Zoom: 5}
+
+    def lookup(properties, propertyID):
+        if propertyID not in properties:
+            raise CanonError(_ErrorCode.ERR_PROPERTIES_UNAVAILABLE)
+        return properties[propertyID]
+
+    monkeypatch.setattr(live_view_metadata, "_getPropertyStruct",
+                        lambda ref, propertyID, param, dataType: lookup(structs, propertyID))
+    monkeypatch.setattr(live_view_metadata, "_getPropertyData",
+                        lambda ref, propertyID, param: lookup(data, propertyID))
+
+    metadata = _readEvfMetadata(None)
+
+    # Histogram is a view over the SDK buffer
+    assert metadata.histogram.shape == (4, 256)
+    assert metadata.histogram[1, 0] == 256
+    histogram[256] = 7
+    assert metadata.histogram[1, 0] == 7
+
+    assert (metadata.zoom, metadata.imagePosition) == (5, (16, 32))
+    assert metadata.histogramStatus is None and metadata.zoomRect is None and metadata.coordinateSystem is None
+
+    assert [point.rect[0] for point in metadata.focusPoints] == [0, 2]
+    assert [point.selected for point in metadata.focusPoints] == [True, False]
+
+
+def test_leased_frame_blocks_next_download(monkeypatch):
+    sdk    = FakeEvfSDK(monkeypatch)
+    stream = LiveViewStream(FakeCamera())
+    stream._leaseTimeout = 0.05
+    stream.start()
+
+    frame = stream.leaseFrame()
+    assert frame.tobytes() == b"\xff\xd8image-0000\xff\xd9"
+
+    # Next download waits for the frame to be released
+    with pytest.raises(RuntimeError):
+        stream.leaseFrame()
+    assert sdk.downloads == 1
+
+    stream._leaseTimeout = 5.
+    threading.Timer(0.05, frame.release).start()
+    with stream.leaseFrame() as frame:
+        assert frame.sequence == 2
+        assert frame.tobytes() == b"\xff\xd8image-0001\xff\xd9"
+
+    # Stopping the stream invalidates the frame still leased
+    frame = stream.leaseFrame()
+    stream.stop()
+    assert frame.released
+    with pytest.raises(RuntimeError):
+        frame.data
+
+
+def test_decoupled_callback(monkeypatch):
+    FakeEvfSDK(monkeypatch)
+    stream    = LiveViewStream(FakeCamera(), decoupled=True)
+    sequences = []
+    called    = threading.Event()
+
+    def slowCallback(frame):
+        sequences.append(frame.sequence)
+        if len(sequences) == 3:
+            called.set()
+        time.sleep(0.1)
+
+    # Acquisition goes on while the callback runs: the frames it misses are dropped
+    stream.start(callback=slowCallback)
+    assert called.wait(5)
+    stream.stop()
+
+    stats = stream.callbackStats
+    assert stats["delivered"] == len(sequences)
+    assert stats["dropped"] > 0
+    assert sequences == sorted(sequences) and sequences[-1] > len(sequences)
+
+
+def test_duplicate_frames(monkeypatch):
+    first, second = b"\xff\xd8first\xff\xd9", b"\xff\xd8other\xff\xd9"
+
+    FakeEvfSDK(monkeypatch, [first, first, second])
+    stream = LiveViewStream(FakeCamera(), duplicates="flag")
+    stream.start()
+    flags = []
+    for _ in range(3):
+        with stream.leaseFrame() as frame:
+            flags.append(frame.isDuplicate)
+    stream.stop()
+
+    assert flags == [False, True, False]
+    assert stream.duplicateCount == 1
+
+    # Skipped duplicates are downloaded again, until the image changes
+    sdk    = FakeEvfSDK(monkeypatch, [first, first, first, second])
+    stream = LiveViewStream(FakeCamera(), duplicates="skip")
+    stream.start()
+    images = []
+    for _ in range(2):
+        with stream.leaseFrame() as frame:
+            images.append(frame.tobytes())
+    stream.stop()
+
+    assert images == [first, second]
+    assert sdk.downloads == 4
+    assert stream.duplicateCount == 2
+
+
+def test_stop_wakes_producer_blocked_on_pool(monkeypatch):
+    FakeEvfSDK(monkeypatch)
+    stream = LiveViewStream(FakeCamera(), framePool=FramePool(capacity=1, slotSize=64, overflow="block"))
+    stream.start()
+
+    # Only slot is leased and never released: the producer blocks on the pool
+    leased   = stream.leaseFrame()
+    consumer = stream.subscribe()
+    time.sleep(0.05)
+
+    start = time.monotonic()
+    stream.stop()
+    assert time.monotonic() - start < 1
+    with pytest.raises(RuntimeError):
+        consumer.get(timeout=0)
+
+    leased.release()
+
+
+def test_stop_inside_async_loop(monkeypatch):
+    FakeEvfSDK(monkeypatch)
+    stream = LiveViewStream(FakeCamera())
+
+    async def main():
+        sequences = []
+        async for frame in stream:
+            sequences.append(frame.sequence)
+            if len(sequences) == 3:
+                stream.stop()
+        return sequences
+
+    assert asyncio.run(main()) == [1, 2, 3]
+
+
+def test_mjpeg_server(monkeypatch):
+    image = b"\xff\xd8" + bytes(512 * 1024) + b"\xff\xd9"
+    FakeEvfSDK(monkeypatch, [image])
+    stream = LiveViewStream(FakeCamera())
+    stream.start()
+
+    with stream.serve(port=0) as server:
+        host, port = server.address
+        assert host == "127.0.0.1"
+
+        # Client which never reads: its frames are dropped, not queued
+        slow = socket.socket()
+        slow.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        slow.connect((host, port))
+        slow.sendall(b"GET / HTTP/1.1\r\n\r\n")
+
+        with socket.create_connection((host, port)) as client:
+            client.sendall(b"GET / HTTP/1.1\r\n\r\n")
+            reader = client.makefile("rb")
+
+            assert reader.readline().startswith(b"HTTP/1.1 200")
+            while reader.readline() != b"\r\n":
+                pass
+
+            assert reader.readline() == b"--" + LiveViewServer._boundary + b"\r\n"
+            headers = {}
+            while (line := reader.readline()) != b"\r\n":
+                name, value = line.decode().split(":", 1)
+                headers[name] = value.strip()
+
+            assert headers["Content-Type"] == "image/jpeg"
+            assert reader.read(int(headers["Content-Length"])) == image
+
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if any(stats["dropped"] for stats in server.clientStats()):
+                break
+            time.sleep(0.01)
+        else:
+            pytest.fail("Slow client did not drop any frame")
+
+        slow.close()
+
+    stream.stop()
+
+
+def test_stopped_async_sessions_release_their_frames(monkeypatch):
+    FakeEvfSDK(monkeypatch)
+    pool   = FramePool(capacity=4, slotSize=64, overflow="raise")
+    stream = LiveViewStream(FakeCamera(), framePool=pool, asyncQueueSize=2)
+
+    async def session():
+        async for frame in stream:
+            # Let the producer fill the queue before stopping
+            await asyncio.sleep(0.1)
+            stream.stop()
+
+    for _ in range(6):
+        asyncio.run(session())
+        assert pool.stats()["inUse"] == 0
@@ -0,0 +1,80 @@
+import pytest
+import struct
+
+
+from pyedsdk.raw_preview import RawPreviews, extractPreviews
+
+
+PREVIEW   = b"\xff\xd8" + b"preview" * 10 + b"\xff\xd9"
+THUMBNAIL = b"\xff\xd8" + b"thumbnail" + b"\xff\xd9"
+
+
+def makeCr2(path):
+    # Header, IFD0 (preview strip), IFD1 (thumbnail), then both JPEGs
+    ifd0Offset = 16
+    ifd1Offset = ifd0Offset + 2 + 2 * 12 + 4
+    dataOffset = ifd1Offset + 2 + 2 * 12 + 4
+
+    previewOffset   = dataOffset
+    thumbnailOffset = dataOffset + len(PREVIEW)
+
+    data  = b"II*\x00" + struct.pack("<I", ifd0Offset) + b"CR\x02\x00" + struct.pack("<I", 0)
+    data += struct.pack("<H", 2)
+    data += struct.pack("<HHII", 0x0111, 4, 1, previewOffset)
+    data += struct.pack("<HHII", 0x0117, 4, 1, len(PREVIEW))
+    data += struct.pack("<I", ifd1Offset)
+    data += struct.pack("<H", 2)
+    data += struct.pack("<HHII", 0x0201, 4, 1, thumbnailOffset)
+    data += struct.pack("<HHII", 0x0202, 4, 1, len(THUMBNAIL))
+    data += struct.pack("<I", 0)
+    data += PREVIEW + THUMBNAIL
+
+    path.write_bytes(data)
+    return path
+
+
+def box(boxType, payload, uuid=b""):
+    return struct.pack(">I", 8 + len(uuid) + len(payload)) + boxType + uuid + payload
+
+def makeCr3(path):
+    thmb = box(b"THMB", struct.pack(">BxxxHHIHH", 0, 160, 120, len(THUMBNAIL), 1, 0) + THUMBNAIL)
+    prvw = box(b"PRVW", struct.pack(">IHHHHI", 0, 1, 1620, 1080, 1, len(PREVIEW)) + PREVIEW)
+
+    data  = box(b"ftyp", b"crx " + struct.pack(">I", 1) + b"crx isom")
+    data += box(b"moov", box(b"uuid", thmb, bytes.fromhex("85c0b687820f11e08111f4ce462b6a48")))
+    data += box(b"uuid", bytes(8) + prvw, bytes.fromhex("eaf42b5e1c984b88b9fbb7dc406e4d16"))
+    data += box(b"mdat", bytes(64))
+
+    path.write_bytes(data)
+    return path
+
+
+@pytest.mark.parametrize("make, format", [(makeCr2, "CR2"), (makeCr3, "CR3")])
+def test_raw_previews(tmp_path, make, format):
+    path = make(tmp_path / f"image.{format}")
+
+    with RawPreviews(str(path)) as previews:
+        assert previews.format == format
+        assert bytes(previews.preview)   == PREVIEW
+        assert bytes(previews.thumbnail) == THUMBNAIL
+        assert previews.preview.readonly
+
+    assert previews.preview is None
+
+
+def test_raw_previews_rejects_other_files(tmp_path):
+    path = tmp_path / "image.jpg"
+    path.write_bytes(PREVIEW)
+
+    with pytest.raises(ValueError):
+        RawPreviews(str(path))
+
+
+def test_extract_previews_batch(tmp_path):
+    makeCr2(tmp_path / "a.CR2")
+    makeCr3(tmp_path / "b.CR3")
+    (tmp_path / "notes.txt").write_text("ignored")
+
+    results = list(extractPreviews(str(tmp_path), lambda previews: len(previews.preview), workers=2))
+    assert [(path.rsplit("/", 1)[-1], size) for path, size in results] == [("a.CR2", len(PREVIEW)),
+                                                                           ("b.CR3", len(PREVIEW))]